@@ -0,0 +1,77 @@
+# Measures how many messages per second the compiled content filter can check
+# Run from src/: python bench_content_filter.py --words 5000
+
+import argparse
+import random
+import re
+import string
+import time
+
+from cogs.content_filter import CompiledBlocklist, parse_blocklist
+
+def random_word(rng, low=3, high=10) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+def synthetic_blocklist(words: int, phrases: int, regexes: int, seed: int) -> list:
+    rng = random.Random(seed)
+    lines = [random_word(rng) for _ in range(words)]
+    lines += [f"{random_word(rng)} {random_word(rng)}" for _ in range(phrases)]
+    lines += [f"re:{random_word(rng, 3, 5)}\\d{{3,}}" for _ in range(regexes)]
+    return lines
+
+def synthetic_messages(count: int, blocked: list, hit_rate: float, seed: int) -> list:
+    """Chat-length messages of random words, `hit_rate` of them containing a blocked entry."""
+    rng = random.Random(seed + 1)
+    messages = []
+    for _ in range(count):
+        words = [random_word(rng, 2, 8) for _ in range(rng.randint(3, 30))]
+        if blocked and rng.random() < hit_rate:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(blocked).upper())
+        messages.append(" ".join(words))
+    return messages
+
+def per_entry_filter(literals, regexes):
+    """What a hand-written filter would do: one precompiled pattern per entry, tried in turn."""
+    patterns = [re.compile(r"(?<!\w)" + re.escape(literal).replace(r"\ ", r"\s+") + r"(?!\w)") for literal in literals]
+    patterns += [re.compile(pattern, re.IGNORECASE) for pattern in regexes]
+
+    def search(text):
+        lowered = text.lower()
+        return next((pattern for pattern in patterns if pattern.search(lowered)), None)
+    return search
+
+def throughput(search, messages) -> tuple:
+    start = time.perf_counter()
+    hits = sum(1 for message in messages if search(message))
+    elapsed = time.perf_counter() - start
+    return len(messages) / elapsed, hits
+
+def main():
+    parser = argparse.ArgumentParser(description="Content filter throughput benchmark")
+    parser.add_argument("--words", type=int, default=5000)
+    parser.add_argument("--phrases", type=int, default=500)
+    parser.add_argument("--regexes", type=int, default=10)
+    parser.add_argument("--messages", type=int, default=50_000)
+    parser.add_argument("--hit-rate", type=float, default=0.01)
+    parser.add_argument("--naive-messages", type=int, default=2000, help="Messages to run through the per-entry baseline (it's slow)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    lines = synthetic_blocklist(args.words, args.phrases, args.regexes, args.seed)
+    literals, regexes = parse_blocklist(lines)
+
+    start = time.perf_counter()
+    blocklist = CompiledBlocklist(literals, regexes)
+    compile_seconds = time.perf_counter() - start
+
+    messages = synthetic_messages(args.messages, literals, args.hit_rate, args.seed)
+    compiled_rate, hits = throughput(blocklist.search, messages)
+    naive_rate, _ = throughput(per_entry_filter(literals, regexes), messages[:args.naive_messages])
+
+    print(f"entries:          {len(blocklist):,}")
+    print(f"compile:          {compile_seconds * 1000:8.1f} ms")
+    print(f"compiled filter:  {compiled_rate:12,.0f} msgs/sec ({1e6 / compiled_rate:.1f} us/msg, {hits:,} hits)")
+    print(f"per-entry regex:  {naive_rate:12,.0f} msgs/sec ({1e6 / naive_rate:.1f} us/msg)")
+
+if __name__ == "__main__":
+    main()
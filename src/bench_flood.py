@@ -0,0 +1,101 @@
+# Replays a simulated busy guild through FloodDetector and checks it keeps up,
+# after checking it trips on exactly the FLOOD_MESSAGES-th message
+# Run from src/: python bench_flood.py --rate 10000 --seconds 60
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from cogs.flood_detector import FLOOD_MESSAGES, FLOOD_WINDOW, FloodDetector
+
+def simulated_traffic(rate: int, seconds: int, channels: int, users: int, spammers: int, seed: int):
+    """Yields (timestamp, channel_id, user_id) at `rate` messages per simulated second.
+
+    Regular users pick a random channel each message; spammers stick to one
+    channel and post every 2 seconds, bursting to 4 a second halfway through.
+    """
+    rng = random.Random(seed)
+    spammer_ids = list(range(users, users + spammers))
+    spammer_channels = {user_id: rng.randrange(channels) for user_id in spammer_ids}
+    burst_at = seconds / 2
+
+    interval = 1 / rate
+    now = 0.0
+    next_spam = {user_id: rng.random() for user_id in spammer_ids}
+    for _ in range(rate * seconds):
+        now += interval
+        for user_id, due in next_spam.items():
+            if due <= now:
+                yield now, spammer_channels[user_id], user_id
+                next_spam[user_id] = due + (0.25 if due >= burst_at else 2.0)
+        yield now, rng.randrange(channels), rng.randrange(users)
+
+def boundary_ok() -> bool:
+    """Checks FLOOD_MESSAGES messages inside the window trip, one fewer or one outside don't."""
+    step = FLOOD_WINDOW / FLOOD_MESSAGES
+    detector = FloodDetector()
+    tripped = [detector.record(1, 1, i * step) for i in range(FLOOD_MESSAGES)]
+    exact = tripped == [False] * (FLOOD_MESSAGES - 1) + [True]
+
+    # Same count, but the first message is just outside the window of the last
+    step = FLOOD_WINDOW / (FLOOD_MESSAGES - 1) * 1.01
+    detector = FloodDetector()
+    spread = not any(detector.record(1, 1, i * step) for i in range(FLOOD_MESSAGES))
+
+    print(f"boundary:         {FLOOD_MESSAGES} messages in {FLOOD_WINDOW:g}s {'trip' if exact else 'FAIL: did not trip on the last one'}, "
+          f"spread over {step * (FLOOD_MESSAGES - 1):.2f}s {'do not' if spread else 'FAIL: still'} trip")
+    return exact and spread
+
+def main():
+    parser = argparse.ArgumentParser(description="Flood detector benchmark")
+    parser.add_argument("--rate", type=int, default=10_000, help="Simulated messages per second")
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--channels", type=int, default=50)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--spammers", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if not boundary_ok():
+        sys.exit(1)
+
+    # Generate up front so only the detector is timed
+    traffic = list(simulated_traffic(args.rate, args.seconds, args.channels, args.users, args.spammers, args.seed))
+    spammer_ids = set(range(args.users, args.users + args.spammers))
+
+    detector = FloodDetector()
+    caught = {}
+    false_positives = set()
+    peak_tracked = 0
+    start = time.perf_counter()
+    for now, channel_id, user_id in traffic:
+        if detector.record(channel_id, user_id, now):
+            if user_id in spammer_ids:
+                caught.setdefault(user_id, now)
+            else:
+                false_positives.add(user_id)
+        peak_tracked = max(peak_tracked, len(detector))
+    elapsed = time.perf_counter() - start
+
+    # Separate pass for memory, tracemalloc slows everything down
+    tracemalloc.start()
+    detector = FloodDetector()
+    for now, channel_id, user_id in traffic:
+        detector.record(channel_id, user_id, now)
+    memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    burst_at = args.seconds / 2
+    delays = sorted(seen - burst_at for seen in caught.values())
+
+    print(f"messages:         {len(traffic):,} over {args.seconds}s simulated")
+    print(f"throughput:       {len(traffic) / elapsed:12,.0f} msgs/sec ({elapsed / len(traffic) * 1e6:.2f} us/msg, {len(traffic) / elapsed / args.rate:.1f}x the simulated rate)")
+    print(f"tracked pairs:    {peak_tracked:,} peak, {len(detector):,} at end")
+    print(f"peak memory:      {memory / 2**20:.1f} MiB")
+    print(f"spammers caught:  {len(caught)}/{args.spammers}" + (f", median {delays[len(delays) // 2]:.2f}s after the burst started" if delays else ""))
+    print(f"false positives:  {len(false_positives)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# Measures the link blocklist: build and load time, memory per domain and lookup throughput
+# Run from src/: python bench_link_filter.py --domains 500000
+
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+import tracemalloc
+
+from cogs.link_filter import URL_PATTERN, DomainTable, LinkFilter, domain_key
+
+TLDS = ["com", "net", "org", "io", "xyz", "ru", "top", "gift", "co.uk", "com.br"]
+
+def random_label(rng, low=4, high=14) -> str:
+    return "".join(rng.choice(string.ascii_lowercase + string.digits) for _ in range(rng.randint(low, high)))
+
+def synthetic_domains(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [f"{random_label(rng)}.{rng.choice(TLDS)}" for _ in range(count)]
+
+def synthetic_hosts(count: int, blocked: list, hit_rate: float, seed: int) -> list:
+    """Hosts as they'd appear in links, `hit_rate` of them under a blocked domain."""
+    rng = random.Random(seed + 1)
+    hosts = []
+    for _ in range(count):
+        if rng.random() < hit_rate:
+            host = rng.choice(blocked)
+        else:
+            host = f"{random_label(rng)}.{rng.choice(TLDS)}"
+        if rng.random() < 0.5:
+            host = f"{random_label(rng, 2, 6)}.{host}"
+        hosts.append(host)
+    return hosts
+
+def synthetic_messages(count: int, hosts: list, link_rate: float, seed: int) -> list:
+    rng = random.Random(seed + 2)
+    messages = []
+    for _ in range(count):
+        words = [random_label(rng, 2, 8) for _ in range(rng.randint(3, 30))]
+        if rng.random() < link_rate:
+            words.insert(rng.randrange(len(words) + 1), f"https://{rng.choice(hosts)}/{random_label(rng)}")
+        messages.append(" ".join(words))
+    return messages
+
+def suffix_set_lookup(domains):
+    """What a hand-written filter would do: a set of domains, checking every parent of the host."""
+    blocked = set(domains)
+
+    def lookup(host):
+        labels = host.split(".")
+        return next((suffix for suffix in (".".join(labels[i:]) for i in range(len(labels) - 1)) if suffix in blocked), None)
+    return lookup, blocked
+
+def measure_memory(build) -> tuple:
+    tracemalloc.start()
+    value = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size
+
+def rate(func, items) -> tuple:
+    start = time.perf_counter()
+    hits = sum(1 for item in items if func(item))
+    return len(items) / (time.perf_counter() - start), hits
+
+def main():
+    parser = argparse.ArgumentParser(description="Link blocklist benchmark")
+    parser.add_argument("--domains", type=int, default=500_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--messages", type=int, default=50_000)
+    parser.add_argument("--hit-rate", type=float, default=0.05)
+    parser.add_argument("--link-rate", type=float, default=0.1, help="Share of messages that contain a link")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    domains = synthetic_domains(args.domains, args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "link_blocklist.txt")
+        compiled_path = os.path.join(directory, "link_blocklist.bin")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(domains))
+
+        start = time.perf_counter()
+        LinkFilter(path, compiled_path)
+        compile_seconds = time.perf_counter() - start
+
+        # Loading the compiled file is what happens at every startup
+        start = time.perf_counter()
+        link_filter = LinkFilter(path, compiled_path)
+        load_seconds = time.perf_counter() - start
+        file_bytes = os.path.getsize(compiled_path)
+    table = link_filter.table
+
+    _, table_bytes = measure_memory(lambda: DomainTable.from_bytes(table.to_bytes()))
+    # Fresh strings, so the set is charged for them the way the table is for its blob
+    (set_lookup, _), set_bytes = measure_memory(lambda: suffix_set_lookup(synthetic_domains(args.domains, args.seed)))
+
+    hosts = synthetic_hosts(args.lookups, domains, args.hit_rate, args.seed)
+    keys = [domain_key(host) for host in hosts]
+    table_rate, table_hits = rate(table.lookup, keys)
+    key_rate, _ = rate(lambda host: table.lookup(domain_key(host)), hosts)
+    set_rate, set_hits = rate(set_lookup, hosts)
+
+    messages = synthetic_messages(args.messages, hosts, args.link_rate, args.seed)
+    message_rate, message_hits = rate(link_filter.check, messages)
+    extract_rate, _ = rate(lambda message: list(URL_PATTERN.finditer(message)), messages)
+
+    print(f"domains:            {len(table):,} kept of {len(domains):,}")
+    print(f"compile:            {compile_seconds * 1000:10.1f} ms")
+    print(f"load compiled:      {load_seconds * 1000:10.1f} ms ({file_bytes / 2**20:.1f} MiB file)")
+    print(f"table memory:       {table_bytes / 2**20:10.1f} MiB ({table_bytes / len(table):.1f} bytes/domain)")
+    print(f"set[str] memory:    {set_bytes / 2**20:10.1f} MiB ({set_bytes / len(domains):.1f} bytes/domain)")
+    print(f"table lookup:       {table_rate:12,.0f} lookups/sec ({table_hits:,} hits)")
+    print(f"  + key building:   {key_rate:12,.0f} lookups/sec")
+    print(f"suffix set lookup:  {set_rate:12,.0f} lookups/sec ({set_hits:,} hits)")
+    print(f"URL extraction:     {extract_rate:12,.0f} msgs/sec")
+    print(f"full message check: {message_rate:12,.0f} msgs/sec ({message_hits:,} hits)")
+
+if __name__ == "__main__":
+    main()
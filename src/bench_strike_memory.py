@@ -0,0 +1,62 @@
+# Compares how much memory strikes take as strikes.json dicts vs packed StrikeTable arrays
+# Run from the repo root: python src/bench_strike_memory.py --strikes 1000000
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from cogs.strike_table import StrikeTable
+
+def synthetic_json(strikes: int, guilds: int, users: int, seed: int) -> dict:
+    """Builds strikes in the strikes.json layout, spread over the last 30 days."""
+    rng = random.Random(seed)
+    now = int(time.time())
+    guild_ids = [rng.getrandbits(60) for _ in range(guilds)]
+    user_ids = [rng.getrandbits(60) for _ in range(users)]
+
+    data = {}
+    for _ in range(strikes):
+        guild_id = str(rng.choice(guild_ids))
+        user_id = str(rng.choice(user_ids))
+        timestamp = datetime.fromtimestamp(now - rng.randrange(30 * 86400), timezone.utc).isoformat()
+        data.setdefault(guild_id, {}).setdefault(user_id, []).append({"timestamp": timestamp})
+    return data
+
+def measure(build):
+    """Returns (result, bytes still allocated) after building something."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Strike memory benchmark")
+    parser.add_argument("--strikes", type=int, default=1_000_000)
+    parser.add_argument("--guilds", type=int, default=4)
+    parser.add_argument("--users", type=int, default=250_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    data, json_bytes = measure(lambda: synthetic_json(args.strikes, args.guilds, args.users, args.seed))
+    table, table_bytes = measure(lambda: StrikeTable.from_json(data))
+    load_seconds = timed(lambda: StrikeTable.from_json(data))
+    save_seconds = timed(table.to_json)
+
+    print(f"strikes:          {len(table):,}")
+    print(f"json dicts:       {json_bytes / len(table):8.1f} bytes/strike ({json_bytes / 2**20:,.1f} MiB)")
+    print(f"StrikeTable:      {table_bytes / len(table):8.1f} bytes/strike ({table_bytes / 2**20:,.1f} MiB)")
+    print(f"from_json:        {load_seconds:8.2f} s")
+    print(f"to_json:          {save_seconds:8.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# Benchmarks the strike path for every storage backend on synthetic datasets
+# Run from the repo root: python src/bench_strikes.py --sizes 10000 100000 1000000 --output bench.json
+# Every result is one JSON object per line: backend, dataset, operation, timings
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from cogs.strike_store import StrikeStore
+from cogs.strike_journal import JournalStrikeStore
+from cogs.strike_service import StrikeService
+from cogs.strike_table import StrikeTable
+
+BACKENDS = {
+    "sqlite": lambda path: StrikeStore(os.path.join(path, "strikes.db"), os.path.join(path, "strikes.json")),
+    "journal": lambda path: JournalStrikeStore(
+        os.path.join(path, "strikes.snapshot.json"),
+        os.path.join(path, "strikes.journal"),
+        os.path.join(path, "strikes.json")
+    ),
+}
+
+DAY = 86400
+
+# How far back each distribution spreads strikes; anything past 30 days is expired.
+# Even "fresh" has a few, so every dataset gives expiry something to remove
+DISTRIBUTIONS = {
+    "fresh": lambda rng: rng.randrange(30 * DAY) if rng.random() < 0.98 else 30 * DAY + rng.randrange(DAY),
+    "uniform": lambda rng: rng.randrange(60 * DAY),
+    "stale": lambda rng: rng.randrange(30 * DAY) if rng.random() < 0.2 else 30 * DAY + rng.randrange(60 * DAY),
+}
+
+def synthetic_table(strikes: int, guilds: int, users: int, distribution: str, seed: int) -> StrikeTable:
+    rng = random.Random(seed)
+    now = int(time.time())
+    age = DISTRIBUTIONS[distribution]
+    guild_ids = [rng.getrandbits(60) for _ in range(guilds)]
+    user_ids = [rng.getrandbits(60) for _ in range(users)]
+
+    table = StrikeTable()
+    for _ in range(strikes):
+        table.add(rng.choice(guild_ids), rng.choice(user_ids), now - age(rng))
+    return table
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def bench_backend(name: str, table: StrikeTable, lookups: int, adds: int, seed: int):
+    """Yields (operation, seconds, operation count) for one backend in a scratch directory.
+
+    Every store operation does the same work on both backends: "load" reads
+    every strike into a StrikeTable, the way the service starts, and "add"
+    makes one durable write per strike.
+    """
+    rng = random.Random(seed)
+    members = [(guild_id, user_id) for guild_id, user_id, _ in table.items()]
+    probes = [rng.choice(members) for _ in range(lookups)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "strikes.json"), "w") as f:
+            json.dump(table.to_json(), f)
+
+        # First start imports strikes.json, which is the backend's full save path
+        store, seconds = timed(BACKENDS[name], tmp)
+        yield "save", seconds, len(table)
+        store.close()
+
+        store, seconds = timed(BACKENDS[name], tmp)
+        yield "open", seconds, 1
+
+        def load():
+            loaded = StrikeTable()
+            for guild_id, user_id, timestamp in store.iter_strikes():
+                loaded.add(guild_id, user_id, timestamp)
+            return loaded
+        loaded, seconds = timed(load)
+        yield "load", seconds, len(loaded)
+
+        now = datetime.now(timezone.utc)
+        _, seconds = timed(lambda: [store.add_strike(guild_id, user_id, now) for guild_id, user_id in probes[:adds]])
+        yield "add", seconds, adds
+        for guild_id, user_id in probes[:adds]:
+            loaded.add(guild_id, user_id, int(now.timestamp()))
+
+        _, seconds = timed(store.compact, loaded)
+        yield "compact", seconds, 1
+
+        # The same operations through the in-memory service the bot actually uses
+        service = StrikeService(store)
+        yield from asyncio.run(bench_service(service, probes, adds))
+
+async def bench_service(service: StrikeService, probes: list, adds: int):
+    results = []
+
+    start = time.perf_counter()
+    await service.start()
+    results.append(("service_load", time.perf_counter() - start, len(service.strikes)))
+
+    # Straight after start, before the background expiry task gets to run: the
+    # dataset's strikes older than 30 days are all still loaded and due
+    start = time.perf_counter()
+    removed = await service.clean_expired()
+    results.append(("service_expire", time.perf_counter() - start, removed))
+
+    start = time.perf_counter()
+    for guild_id, user_id in probes:
+        service.count_active(guild_id, user_id)
+    results.append(("service_count", time.perf_counter() - start, len(probes)))
+
+    # Second pass over the same members is served from the active-count cache
+    start = time.perf_counter()
+    for guild_id, user_id in probes:
+        service.count_active(guild_id, user_id)
+    results.append(("service_count_cached", time.perf_counter() - start, len(probes)))
+
+    start = time.perf_counter()
+    for guild_id, user_id in probes[:adds]:
+        await service.add_strike(guild_id, user_id)
+    results.append(("service_add", time.perf_counter() - start, adds))
+
+    start = time.perf_counter()
+    await service.compact()
+    results.append(("service_compact", time.perf_counter() - start, 1))
+
+    await service.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Strike subsystem benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--distributions", nargs="+", choices=DISTRIBUTIONS.keys(), default=list(DISTRIBUTIONS))
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS.keys(), default=list(BACKENDS))
+    parser.add_argument("--guilds", type=int, default=50)
+    parser.add_argument("--users-per-strike", type=float, default=0.25, help="distinct users as a fraction of strikes")
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument("--adds", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="append results here instead of stdout")
+    args = parser.parse_args()
+
+    out = open(args.output, "a") if args.output else sys.stdout
+    try:
+        for size in args.sizes:
+            for distribution in args.distributions:
+                users = max(1, int(size * args.users_per_strike))
+                table = synthetic_table(size, args.guilds, users, distribution, args.seed)
+                for backend in args.backends:
+                    for operation, seconds, count in bench_backend(backend, table, args.lookups, args.adds, args.seed):
+                        out.write(json.dumps({
+                            "backend": backend,
+                            "strikes": size,
+                            "distribution": distribution,
+                            "operation": operation,
+                            "count": count,
+                            "seconds": round(seconds, 6),
+                            "us_per_op": round(seconds / count * 1e6, 3) if count else None,
+                        }) + "\n")
+                        out.flush()
+    finally:
+        if args.output:
+            out.close()
+
+if __name__ == "__main__":
+    main()
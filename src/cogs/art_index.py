@@ -0,0 +1,111 @@
+import os
+import time
+from array import array
+
+from cogs.image_hash import hamming
+
+MATCH_DISTANCE = 10     # pHash bits apart that still look like the same picture
+DHASH_DISTANCE = 16     # dHash has to roughly agree too, it catches pHash collisions
+FIELDS = 5              # phash, dhash, user_id, message_id, submitted
+
+class BKTree:
+    """Finds stored 64 bit hashes within a Hamming distance of a query.
+
+    Each node keeps its children by their distance to it. Hamming distance is
+    a metric, so for a query at distance d from a node only children at
+    distances d - r to d + r can hold a match, and most of the tree is skipped.
+    Nodes are [hash, values, {distance: child}].
+    """
+
+    def __init__(self) -> None:
+        self.root = None
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, value_hash: int, value) -> None:
+        self.size += 1
+        if self.root is None:
+            self.root = [value_hash, [value], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(value_hash, node[0])
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value_hash, [value], {}]
+                return
+            node = child
+
+    def search(self, query: int, max_distance: int) -> list:
+        """Returns (distance, value) for everything within max_distance, closest first."""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(query, node[0])
+            if distance <= max_distance:
+                found.extend((distance, value) for value in node[1])
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        found.sort(key=lambda match: match[0])
+        return found
+
+class ArtIndex:
+    """Hashes of every artist application image, to spot reposts.
+
+    Lookups go through a BKTree on the pHash; a candidate only counts if its
+    dHash is close as well. Submissions are saved to `path` as a flat array of
+    (phash, dhash, user_id, message_id, submitted) and the tree is rebuilt from
+    it on start, which is quick at the size this gets to.
+    """
+
+    def __init__(self, path: str = "art_index.bin") -> None:
+        self.path = os.path.abspath(path)
+        self.tree = BKTree()
+        self.rows = array("Q")
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self.tree)
+
+    def load(self) -> None:
+        rows = array("Q")
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        # Drop a torn trailing record
+        rows.frombytes(data[:len(data) - len(data) % (rows.itemsize * FIELDS)])
+        for i in range(0, len(rows), FIELDS):
+            self.insert(*rows[i:i + FIELDS])
+
+    def insert(self, phash: int, dhash: int, user_id: int, message_id: int, submitted: int) -> None:
+        self.rows.extend((phash, dhash, user_id, message_id, submitted))
+        self.tree.add(phash, (dhash, user_id, message_id, submitted))
+
+    def add(self, phash: int, dhash: int, user_id: int, message_id: int) -> None:
+        self.insert(phash, dhash, user_id, message_id, int(time.time()))
+
+    def matches(self, phash: int, dhash: int, max_distance: int = MATCH_DISTANCE) -> list:
+        """Earlier submissions that look like this image, as (phash distance, dhash distance, user_id, message_id, submitted)."""
+        found = []
+        for distance, (stored_dhash, user_id, message_id, submitted) in self.tree.search(phash, max_distance):
+            dhash_distance = hamming(dhash, stored_dhash)
+            if dhash_distance <= DHASH_DISTANCE:
+                found.append((distance, dhash_distance, user_id, message_id, submitted))
+        return found
+
+    def save(self) -> None:
+        # tobytes copies in one step, so a submission added meanwhile can't tear the write
+        data = self.rows.tobytes()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
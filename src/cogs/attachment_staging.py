@@ -0,0 +1,126 @@
+import aiohttp
+import discord
+import io
+import os
+import tempfile
+from typing import Optional
+
+SPOOL_THRESHOLD = 8 * 1024 * 1024    # Attachments bigger than this go straight to a temp file
+MEMORY_BUDGET = 25 * 1024 * 1024     # Most attachment bytes one command keeps in memory
+CHUNK_SIZE = 64 * 1024               # Bytes read from the CDN at a time
+
+class StagedAttachment:
+    """One downloaded attachment, held in memory or in a temp file."""
+
+    def __init__(self, attachment: discord.Attachment, data: Optional[bytes] = None, path: Optional[str] = None) -> None:
+        self.filename = attachment.filename
+        self.content_type = attachment.content_type
+        self.spoiler = attachment.is_spoiler()
+        self.size = attachment.size
+        self.data = data
+        self.path = path
+
+    def open(self):
+        """A fresh read handle; in-memory bytes are shared, not copied."""
+        if self.data is not None:
+            return io.BytesIO(self.data)
+        return open(self.path, "rb")
+
+    def to_file(self) -> discord.File:
+        return discord.File(self.open(), filename=self.filename, spoiler=self.spoiler)
+
+class AttachmentStage:
+    """Downloads a message's attachments once so every destination can reuse them.
+
+    discord.File is consumed by the send it's passed to, so `files()` hands out a
+    new File per destination, all reading the same staged bytes. Downloads are
+    streamed in chunks and charged against `memory_budget` as they arrive; an
+    attachment that outgrows `spool_threshold` or the budget moves to a temp
+    file part way and gives its memory back. It's the same idea as a
+    SpooledTemporaryFile, but the temp file needs a path so each File can open
+    its own handle.
+    """
+
+    def __init__(self, memory_budget: int = MEMORY_BUDGET, spool_threshold: int = SPOOL_THRESHOLD, session: Optional[aiohttp.ClientSession] = None) -> None:
+        self.memory_budget = memory_budget
+        self.spool_threshold = spool_threshold
+        self.memory_used = 0
+        self.staged = []
+        self.session = session
+        self.owns_session = session is None
+
+    def fits_in_memory(self, size: int, extra: int) -> bool:
+        return size + extra <= self.spool_threshold and self.memory_used + extra <= self.memory_budget
+
+    async def add(self, attachment: discord.Attachment) -> StagedAttachment:
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+
+        chunks = []
+        charged = 0     # Bytes of this attachment counted against the memory budget
+        spool = None
+        path = None
+        try:
+            # The declared size is checked up front so big files never touch memory at all
+            if not self.fits_in_memory(0, attachment.size):
+                fd, path = tempfile.mkstemp(prefix="jira-attachment-")
+                spool = os.fdopen(fd, "wb")
+
+            # proxy_url keeps working for a while after the message is deleted, like read(use_cached=True)
+            async with self.session.get(attachment.proxy_url) as response:
+                if response.status != 200:
+                    raise discord.HTTPException(response, "Couldn't download the attachment")
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    if spool is None and not self.fits_in_memory(charged, len(chunk)):
+                        fd, path = tempfile.mkstemp(prefix="jira-attachment-")
+                        spool = os.fdopen(fd, "wb")
+                        spool.writelines(chunks)
+                        chunks = []
+                        self.memory_used -= charged
+                        charged = 0
+                    if spool is None:
+                        chunks.append(chunk)
+                        charged += len(chunk)
+                        self.memory_used += len(chunk)
+                    else:
+                        spool.write(chunk)
+        except BaseException:
+            self.memory_used -= charged
+            if spool:
+                spool.close()
+                os.remove(path)
+            raise
+
+        if spool:
+            spool.close()
+            staged = StagedAttachment(attachment, path=path)
+        else:
+            staged = StagedAttachment(attachment, data=b"".join(chunks))
+        self.staged.append(staged)
+        return staged
+
+    async def add_all(self, attachments) -> list:
+        """Stages every attachment, returns the errors for the ones that failed."""
+        errors = []
+        for attachment in attachments:
+            try:
+                await self.add(attachment)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+    def files(self) -> list:
+        return [staged.to_file() for staged in self.staged]
+
+    async def close(self) -> None:
+        if self.session and self.owns_session:
+            await self.session.close()
+        self.session = None
+        for staged in self.staged:
+            if staged.path:
+                try:
+                    os.remove(staged.path)
+                except OSError:
+                    pass
+        self.staged = []
+        self.memory_used = 0
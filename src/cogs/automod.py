@@ -0,0 +1,232 @@
+import asyncio
+import discord
+import time
+from datetime import timedelta
+from discord.ext import commands, tasks
+from cogs.ids import *
+from cogs.batch_timeout import timeout_members
+from cogs.content_filter import RELOAD_INTERVAL, ContentFilter
+from cogs.dispatch import log_or_warn
+from cogs.duplicate_detector import FLUSH_INTERVAL, DuplicateDetector
+from cogs.flood_detector import FloodDetector
+from cogs.link_filter import LinkFilter
+from cogs.purge import delete_in_chunks, for_each_channel
+from cogs.raid_detector import join_weight
+
+FLOOD_TIMEOUT = timedelta(minutes=10)
+DUPLICATE_TIMEOUT = timedelta(hours=1)
+LOCKDOWN_TIMEOUT = timedelta(hours=1)
+# Copied spam is only acted on when it comes mostly from accounts this new, or that joined this recently
+NEW_ACCOUNT_AGE = timedelta(days=7)
+NEW_MEMBER_AGE = timedelta(days=1)
+
+def is_exempt(member) -> bool:
+    """Staff and protected members aren't auto-moderated."""
+    return any(role.id in PROTECTED_ROLE_IDS or role.id == MOD_ROLE_ID for role in getattr(member, "roles", []))
+
+def is_new(member: discord.Member, now) -> bool:
+    """A fresh account, or one that only just joined: what copied spam raids are made of."""
+    return now - member.created_at < NEW_ACCOUNT_AGE or (member.joined_at is not None and now - member.joined_at < NEW_MEMBER_AGE)
+
+class AutoModCog(commands.Cog):
+    def __init__(self, bot: commands.Bot) -> None:
+        self.bot = bot
+        self.content_filter = ContentFilter()
+        self.flood = FloodDetector()
+        self.duplicates = DuplicateDetector()
+        self.links = LinkFilter()
+        # Clusters that turned out to be regular members (a meme, a birthday chain), already logged once
+        self.ignored_clusters = set()
+        self.process_lockdowns.start()
+        self.reload_blocklists.start()
+        self.flush_duplicates.start()
+
+    def cog_unload(self) -> None:
+        self.process_lockdowns.cancel()
+        self.reload_blocklists.cancel()
+        self.flush_duplicates.cancel()
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if not message.guild or message.author.bot or is_exempt(message.author):
+            return
+
+        matched = self.content_filter.check(message.content)
+        if matched:
+            await self.remove_blocked(message, matched)
+            return
+
+        blocked_domain = self.links.check(message.content)
+        if blocked_domain:
+            await self.remove_blocked(message, blocked_domain, f"{TRASH_EMOJI} Blocked Link Removed")
+            return
+
+        now = time.monotonic()
+        cluster = self.duplicates.record(message.channel.id, message.id, message.author.id, message.content, now)
+        if cluster:
+            await self.remove_duplicate_cluster(message.guild, cluster, message.content)
+            return
+
+        if self.flood.record(message.channel.id, message.author.id, now):
+            await self.timeout_flooder(message)
+
+    async def remove_blocked(self, message: discord.Message, matched: str, title: str = f"{TRASH_EMOJI} Blocked Message Removed"):
+        try:
+            await message.delete()
+        except discord.NotFound:
+            return
+        except discord.HTTPException as e:
+            print(f"Couldn't delete blocked message {message.id}: {e}")
+            return
+        self.bot.message_index.forget(message.id)
+
+        content_preview = message.content
+        if len(content_preview) > 1000:
+            content_preview = content_preview[:1000] + "\n... *(truncated)*"
+
+        embed = discord.Embed(
+            title=title,
+            description=f"**Author:** {message.author.mention}\n**Channel:** {message.channel.mention}\n**Matched:** `{matched}`\n\n{content_preview}",
+            color=discord.Color.red()
+        )
+        embed.timestamp = discord.utils.utcnow()
+        await log_or_warn(self.bot, embed)
+
+    async def timeout_flooder(self, message: discord.Message):
+        if not isinstance(message.author, discord.Member):
+            return
+        moderation = self.bot.get_cog("ModerationCog")
+        reason = f"Flooding: {self.flood.max_messages} messages in {self.flood.window:g}s in #{message.channel.name}"
+        try:
+            await moderation.apply_timeout(message.author, FLOOD_TIMEOUT, "10m", reason, "Automatic action", self.bot.user.mention)
+        except discord.HTTPException as e:
+            print(f"Couldn't time out {message.author} for flooding: {e}")
+
+    async def remove_duplicate_cluster(self, guild: discord.Guild, cluster: list, content: str):
+        """Deletes the new accounts' copies in a cluster and times them out, as one action.
+
+        Only new accounts and fresh joiners (see is_new) are acted on. When most
+        of the posters are established members it's a chat meme rather than a
+        raid, so the cluster is logged once for staff and left alone.
+        """
+        now = discord.utils.utcnow()
+        posters = {user_id: guild.get_member(user_id) for user_id in {entry.user_id for entry in cluster}}
+        # Accounts that already left can't be judged, but their copies can still go
+        targets = {user_id for user_id, member in posters.items() if member is None or (not is_exempt(member) and is_new(member, now))}
+        established = [member for member in posters.values() if member and not is_exempt(member) and member.id not in targets]
+
+        content_preview = content
+        if len(content_preview) > 1000:
+            content_preview = content_preview[:1000] + "\n... *(truncated)*"
+
+        cluster_id = cluster[0].cluster
+        if len(established) >= len(targets):
+            if cluster_id in self.ignored_clusters:
+                return
+            if len(self.ignored_clusters) > 1000:
+                self.ignored_clusters.clear()
+            self.ignored_clusters.add(cluster_id)
+            embed = discord.Embed(
+                title=f"{WARNING_EMOJI} Copied Messages Left Alone",
+                description=f"**Posters:** {len(posters)}, {len(established)} of them established members\nMostly established members, so nothing was removed. Later copies won't be logged.\n\n{content_preview}",
+                color=discord.Color.orange()
+            )
+            embed.timestamp = discord.utils.utcnow()
+            await log_or_warn(self.bot, embed)
+            return
+        self.ignored_clusters.discard(cluster_id)
+
+        by_channel = {}
+        for entry in cluster:
+            if entry.user_id in targets:
+                by_channel.setdefault(entry.channel_id, []).append(discord.Object(id=entry.message_id))
+        channels = [channel for channel in map(guild.get_channel, by_channel) if channel]
+        removing = sum(len(messages) for messages in by_channel.values())
+
+        deleted, delete_errors = await for_each_channel(channels, lambda channel: delete_in_chunks(channel, by_channel[channel.id]))
+        for messages in by_channel.values():
+            for message in messages:
+                self.bot.message_index.forget(message.id)
+
+        members = [member for member in map(posters.get, targets) if member]
+        timed_out, failed = await timeout_members(members, DUPLICATE_TIMEOUT, "Posting copied spam across accounts")
+
+        accounts = " ".join(member.mention for member in timed_out) or "None"
+        if len(accounts) > 2000:
+            accounts = accounts[:2000].rsplit(" ", 1)[0] + "\n... *(truncated)*"
+
+        deleted_count = sum(len(by_channel[channel.id]) - len(skipped) for channel, skipped in deleted.items())
+        embed = discord.Embed(
+            title=f"{TRASH_EMOJI} Copied Spam Removed",
+            description=f"**Messages deleted:** {deleted_count}/{removing} in {len(deleted)} channel(s)\n**Timed out (1h):** {len(timed_out)}/{len(members)}\n**Left alone (established):** {len(established)}\n**Moderator:** {self.bot.user.mention}\n\n{accounts}\n\n{content_preview}",
+            color=discord.Color.red()
+        )
+        if delete_errors or failed:
+            embed.set_footer(text=f"{len(delete_errors)} channel(s) couldn't be cleaned, {len(failed)} timeout(s) failed")
+        embed.timestamp = discord.utils.utcnow()
+        await log_or_warn(self.bot, embed)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        if member.bot:
+            return
+        weight = join_weight(member.created_at, member.avatar is not None, discord.utils.utcnow())
+        if self.bot.raids.record_join(member.guild.id, member.id, weight, time.monotonic()):
+            embed = discord.Embed(
+                title=f"{LOCK_EMOJI} Raid Detected, Lockdown Started",
+                description=f"Joins are arriving faster than usual. Recent and new joiners will be timed out for {LOCKDOWN_TIMEOUT.total_seconds() / 3600:g}h until things calm down.\nEnd it early with `/mod lockdown enabled:False`.",
+                color=discord.Color.red()
+            )
+            embed.timestamp = discord.utils.utcnow()
+            await log_or_warn(self.bot, embed)
+
+    @tasks.loop(seconds=5)
+    async def process_lockdowns(self):
+        # Joiners are queued during a lockdown and timed out here in batches, not one by one
+        for guild in self.bot.guilds:
+            pending = self.bot.raids.take_pending(guild.id)
+            if pending:
+                members = [member for member in map(guild.get_member, dict.fromkeys(pending)) if member and not is_exempt(member)]
+                timed_out, failed = await timeout_members(members, LOCKDOWN_TIMEOUT, "Joined during a raid lockdown")
+                if members:
+                    accounts = " ".join(member.mention for member in timed_out) or "None"
+                    if len(accounts) > 3500:
+                        accounts = accounts[:3500].rsplit(" ", 1)[0] + "\n... *(truncated)*"
+                    embed = discord.Embed(
+                        title=f"{HOURGLASS_EMOJI} Lockdown Timeouts",
+                        description=f"**Timed out:** {len(timed_out)}/{len(members)}\n\n{accounts}",
+                        color=discord.Color.orange()
+                    )
+                    embed.timestamp = discord.utils.utcnow()
+                    await log_or_warn(self.bot, embed)
+
+            if self.bot.raids.lockdown_expired(guild.id, time.monotonic()):
+                embed = discord.Embed(
+                    title=f"{UNLOCK_EMOJI} Lockdown Lifted",
+                    description="No joins for a while, new members are no longer timed out.",
+                    color=discord.Color.green()
+                )
+                embed.timestamp = discord.utils.utcnow()
+                await log_or_warn(self.bot, embed)
+
+    @process_lockdowns.before_loop
+    async def before_process_lockdowns(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(seconds=FLUSH_INTERVAL)
+    async def flush_duplicates(self):
+        # Copies of an already flagged cluster are queued by the detector and cleaned up here in batches
+        for content, cluster in self.duplicates.take_pending():
+            channel = self.bot.get_channel(cluster[0].channel_id)
+            if channel:
+                await self.remove_duplicate_cluster(channel.guild, cluster, content)
+
+    @flush_duplicates.before_loop
+    async def before_flush_duplicates(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(seconds=RELOAD_INTERVAL)
+    async def reload_blocklists(self):
+        # Recompiling a big list takes up to a couple of seconds, too long to do inside on_message
+        await asyncio.to_thread(self.content_filter.reload)
+        await asyncio.to_thread(self.links.reload)
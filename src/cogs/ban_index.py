@@ -0,0 +1,52 @@
+import discord
+from typing import Optional
+
+class BanIndex:
+    """Banned user IDs per guild, kept in memory.
+
+    Built once from the guild's ban list, then kept current from
+    on_member_ban/on_member_unban so checking whether someone is banned doesn't
+    page through the whole list. `reconcile` rebuilds it from the API to catch
+    anything missed while the bot was offline or disconnected.
+    """
+
+    def __init__(self) -> None:
+        self.bans = {}
+        # Ban events seen while a guild's list is being fetched, replayed on top of it after
+        self.pending = {}
+
+    def is_banned(self, guild_id: int, user_id: int) -> Optional[bool]:
+        """True/False once the guild has been indexed, None before that."""
+        bans = self.bans.get(guild_id)
+        if bans is None:
+            return None
+        return user_id in bans
+
+    def add(self, guild_id: int, user_id: int) -> None:
+        if guild_id in self.pending:
+            self.pending[guild_id].append((True, user_id))
+        if guild_id in self.bans:
+            self.bans[guild_id].add(user_id)
+
+    def remove(self, guild_id: int, user_id: int) -> None:
+        if guild_id in self.pending:
+            self.pending[guild_id].append((False, user_id))
+        if guild_id in self.bans:
+            self.bans[guild_id].discard(user_id)
+
+    async def reconcile(self, guild: discord.Guild) -> tuple:
+        """Rebuilds a guild's bans from the API, returns (missing, stale) counts that were fixed."""
+        self.pending[guild.id] = []
+        try:
+            fetched = {ban.user.id async for ban in guild.bans(limit=None)}
+            for banned, user_id in self.pending[guild.id]:
+                if banned:
+                    fetched.add(user_id)
+                else:
+                    fetched.discard(user_id)
+        finally:
+            del self.pending[guild.id]
+
+        old = self.bans.get(guild.id, set())
+        self.bans[guild.id] = fetched
+        return len(fetched - old), len(old - fetched)
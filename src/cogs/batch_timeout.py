@@ -0,0 +1,19 @@
+import asyncio
+import discord
+from datetime import timedelta
+
+TIMEOUT_CHUNK = 10  # Timeouts sent at once; each is its own request, so keep bursts small
+
+async def timeout_members(members: list, duration: timedelta, reason: str, chunk_size: int = TIMEOUT_CHUNK) -> tuple:
+    """Times out every member, `chunk_size` requests at a time.
+
+    Returns (timed_out, failed) lists of members; one failure doesn't stop the rest.
+    """
+    until = discord.utils.utcnow() + duration
+    timed_out, failed = [], []
+    for start in range(0, len(members), chunk_size):
+        chunk = members[start:start + chunk_size]
+        results = await asyncio.gather(*(member.timeout(until, reason=reason) for member in chunk), return_exceptions=True)
+        for member, result in zip(chunk, results):
+            (failed if isinstance(result, Exception) else timed_out).append(member)
+    return timed_out, failed
@@ -0,0 +1,132 @@
+import os
+import re
+from typing import Optional
+
+RELOAD_INTERVAL = 5     # Seconds between checks of the blocklist files' mtimes
+
+def parse_blocklist(lines) -> tuple:
+    """Splits blocklist lines into (literals, regexes).
+
+    One entry per line. `re:` entries are regular expressions; anything else is
+    a word or phrase matched whole and case-insensitively. Blank lines and lines
+    starting with # are skipped.
+    """
+    literals, regexes = [], []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("re:"):
+            regexes.append(line[3:])
+        else:
+            literals.append(" ".join(line.lower().split()))
+    return literals, regexes
+
+def trie_pattern(words) -> str:
+    """Turns words into one regex shaped like a trie of their characters.
+
+    `(?:spam|spar)` becomes `spa(?:m|r)`, so the regex engine follows a single
+    branch per character instead of retrying every word at every position.
+    Spaces in phrases match any run of whitespace.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node) -> str:
+        ends = "" in node
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + emit(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not ends:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        return body + "?" if ends else body
+
+    return emit(trie)
+
+class CompiledBlocklist:
+    """Every blocklist entry folded into two compiled patterns.
+
+    Words and phrases share one trie-shaped regex, bounded so they only match
+    whole words and run against the lowercased text (cheaper than IGNORECASE).
+    The `re:` entries are joined into a second regex, one named group each so a
+    match can be traced back to the entry that caused it.
+    """
+
+    def __init__(self, literals: list, regexes: list) -> None:
+        self.literals = set(literals)
+        self.regexes = regexes
+        self.literal_pattern = None
+        self.regex_pattern = None
+        if literals:
+            self.literal_pattern = re.compile(r"(?<!\w)" + trie_pattern(literals) + r"(?!\w)")
+        if regexes:
+            self.regex_pattern = re.compile("|".join(f"(?P<re{i}>{pattern})" for i, pattern in enumerate(regexes)), re.IGNORECASE)
+
+    def __len__(self) -> int:
+        return len(self.literals) + len(self.regexes)
+
+    def search(self, text: str) -> Optional[str]:
+        """Returns the entry that matched `text`, or None."""
+        if self.literal_pattern:
+            match = self.literal_pattern.search(text.lower())
+            if match:
+                return " ".join(match.group().split())
+        if self.regex_pattern:
+            match = self.regex_pattern.search(text)
+            if match:
+                return "re:" + self.regexes[int(match.lastgroup[2:])]
+        return None
+
+class ContentFilter:
+    """Checks messages against the blocklist in `path`.
+
+    The file is compiled once; `check` only runs the current compiled regex.
+    `reload` looks at the file's mtime and recompiles if it changed, so the
+    list can be edited while the bot is running. It's called every
+    RELOAD_INTERVAL seconds from a background loop, off the event loop, since
+    compiling a big list takes a while. A list that fails to compile is
+    reported and the previous one stays in use.
+    """
+
+    def __init__(self, path: str = "blocklist.txt") -> None:
+        self.path = os.path.abspath(path)
+        self.blocklist = CompiledBlocklist([], [])
+        self.mtime = None
+        self.reload()
+
+    def reload(self) -> bool:
+        """Recompiles the blocklist if the file changed, returns True if it did."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self.mtime:
+            return False
+
+        try:
+            if mtime is None:
+                blocklist = CompiledBlocklist([], [])
+            else:
+                with open(self.path, encoding="utf-8") as f:
+                    blocklist = CompiledBlocklist(*parse_blocklist(f))
+        except (OSError, re.error) as e:
+            # Remember the mtime anyway so a broken file is reported once, not every interval
+            print(f"Couldn't load blocklist {self.path}: {e}")
+            self.mtime = mtime
+            return False
+
+        # Swapped in whole, so a check running meanwhile sees either the old list or the new one
+        self.blocklist = blocklist
+        self.mtime = mtime
+        return True
+
+    def check(self, text: str) -> Optional[str]:
+        return self.blocklist.search(text)
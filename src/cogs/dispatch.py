@@ -0,0 +1,69 @@
+import asyncio
+import discord
+from cogs.ids import *
+
+async def attempt(coro) -> Exception | None:
+    """Awaits coro and returns the exception it raised instead of raising it."""
+    try:
+        await coro
+        return None
+    except Exception as e:
+        return e
+
+def describe(error: Exception) -> str:
+    if isinstance(error, discord.Forbidden):
+        return "no permission, or DMs disabled"
+    if isinstance(error, discord.NotFound):
+        return "not found"
+    return str(error) or type(error).__name__
+
+async def send_log(bot, embed: discord.Embed, standalone: bool = False, files: list = None) -> discord.Message:
+    """Queues an embed on the log writer and waits for the message it was posted in."""
+    return await (await bot.log_writer.send(embed, standalone=standalone, files=files))
+
+async def log_or_warn(bot, embed: discord.Embed, interaction: discord.Interaction = None, standalone: bool = False, files: list = None) -> discord.Message | None:
+    """send_log for callers that don't go through ActionDispatch; never raises.
+
+    If the log can't be written, whoever ran the command gets a warning, the
+    way every command used to say "log channel not found". Without an
+    interaction the log writer has already printed the failure.
+    """
+    try:
+        return await send_log(bot, embed, standalone=standalone, files=files)
+    except Exception as e:
+        if interaction:
+            await interaction.followup.send(f"{WARNING_EMOJI} Could not write to the log channel: {describe(e)}", ephemeral=True)
+        return None
+
+class ActionDispatch:
+    """Sends the notifications that go with a moderation action.
+
+    `first` awaits one step before anything else happens (the DM has to reach
+    someone before they're banned). `together` sends independent steps at the
+    same time; one failing doesn't stop the others. Every outcome is kept so
+    `summary` can tell the moderator which destinations worked.
+    """
+
+    def __init__(self) -> None:
+        self.results = []
+
+    async def first(self, destination: str, coro) -> bool:
+        error = await attempt(coro)
+        self.results.append((destination, error))
+        return error is None
+
+    async def together(self, steps: dict) -> None:
+        errors = await asyncio.gather(*(attempt(coro) for coro in steps.values()))
+        self.results.extend(zip(steps.keys(), errors))
+
+    def failed(self) -> list:
+        return [destination for destination, error in self.results if error is not None]
+
+    def summary(self) -> str:
+        parts = []
+        for destination, error in self.results:
+            if error is None:
+                parts.append(f"{CHECK_EMOJI} {destination}")
+            else:
+                parts.append(f"{X_EMOJI} {destination} ({describe(error)})")
+        return " · ".join(parts)
@@ -0,0 +1,153 @@
+import re
+from collections import deque
+
+MIN_USERS = 5           # Distinct accounts posting the same thing...
+WINDOW = 20.0           # ...within this many seconds makes a cluster (automod then checks the accounts' age)
+MAX_DISTANCE = 6        # Fingerprints this many bits apart count as the same text
+MIN_LENGTH = 20         # Shorter messages ("lol", "gg") are too common to judge
+MAX_ENTRIES = 20_000    # Hard cap on remembered messages, the oldest go first
+MAX_BATCH = 25          # Copies of a flagged cluster handed back together once this many are waiting
+FLUSH_INTERVAL = 3.0    # Seconds between flushes of smaller batches
+
+# 7 bands of 9 bits: two fingerprints within 6 bits must agree on at least one band
+BANDS = MAX_DISTANCE + 1
+BAND_BITS = 9
+BAND_MASK = (1 << BAND_BITS) - 1
+HASH_MASK = (1 << 64) - 1
+SHINGLE_SIZE = 3
+MAX_TEXT = 500          # Only the start of long messages is fingerprinted
+
+NOISE = re.compile(r"[^\w ]+")
+
+def shingles(text: str) -> set:
+    """Overlapping 3 character pieces of the text, ignoring case, punctuation and spacing."""
+    normalized = " ".join(NOISE.sub("", text[:MAX_TEXT].lower()).split())
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(max(1, len(normalized) - SHINGLE_SIZE + 1))}
+
+def simhash(features) -> int:
+    """64 bit SimHash: each bit is set when most feature hashes have it set.
+
+    Per-bit counts are kept bit-sliced (plane i holds bit i of every count), so
+    adding a hash costs a few big-int operations instead of a 64 step loop.
+    """
+    planes = []
+    count = 0
+    for feature in features:
+        carry = hash(feature) & HASH_MASK
+        count += 1
+        for i in range(len(planes)):
+            planes[i], carry = planes[i] ^ carry, planes[i] & carry
+            if not carry:
+                break
+        if carry:
+            planes.append(carry)
+
+    # Bit b is set where its count > count // 2, compared plane by plane from the top
+    threshold = count // 2
+    greater, equal = 0, HASH_MASK
+    for i in reversed(range(max(len(planes), threshold.bit_length()))):
+        plane = planes[i] if i < len(planes) else 0
+        threshold_bit = HASH_MASK if (threshold >> i) & 1 else 0
+        greater |= equal & plane & ~threshold_bit
+        equal &= ~(plane ^ threshold_bit)
+    return greater & HASH_MASK
+
+class Fingerprint:
+    __slots__ = ("time", "value", "channel_id", "message_id", "user_id", "cluster")
+
+    def __init__(self, time: float, value: int, channel_id: int, message_id: int, user_id: int) -> None:
+        self.time = time
+        self.value = value
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.user_id = user_id
+        self.cluster = None     # Number of the cluster it was flagged in
+
+class DuplicateDetector:
+    """Spots the same (or lightly edited) text posted by many accounts at once.
+
+    Every message gets a SimHash fingerprint. Its bits are split into 7 bands
+    of 9 and the fingerprint is filed under each band's value, so any two
+    fingerprints within 6 bits of each other share at least one bucket and
+    finding near duplicates only looks at a few candidates.
+
+    Fingerprints older than `window` seconds are dropped, oldest first. Since
+    every bucket is filled in time order too, the expiring fingerprint is always
+    at the front of its buckets.
+
+    Once `min_users` accounts have posted near duplicates inside the window,
+    `record` returns every fingerprint in the cluster. Those stay flagged, and
+    later messages that match them are queued per cluster instead of being
+    returned one by one: `record` hands a cluster's queue back once it holds
+    `max_batch` copies, and `take_pending` drains the rest, so a spam wave
+    is cleaned up in a few batches rather than a delete and log per message.
+    """
+
+    def __init__(self, min_users: int = MIN_USERS, window: float = WINDOW, max_distance: int = MAX_DISTANCE, min_length: int = MIN_LENGTH, max_entries: int = MAX_ENTRIES, max_batch: int = MAX_BATCH) -> None:
+        self.min_users = min_users
+        self.window = window
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self.max_entries = max_entries
+        self.max_batch = max_batch
+        self.entries = deque()
+        self.buckets = {}
+        self.clusters = 0
+        # Cluster number -> (text of the first queued copy, queued fingerprints)
+        self.pending = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def record(self, channel_id: int, message_id: int, user_id: int, text: str, now: float) -> list:
+        """Records a message, returns the fingerprints to act on (usually none)."""
+        self.expire(now)
+        if len(text) < self.min_length:
+            return []
+
+        fingerprint = Fingerprint(now, simhash(shingles(text)), channel_id, message_id, user_id)
+        keys = [(band, (fingerprint.value >> (band * BAND_BITS)) & BAND_MASK) for band in range(BANDS)]
+
+        near = {}
+        for key in keys:
+            for candidate in self.buckets.get(key, ()):
+                if (candidate.value ^ fingerprint.value).bit_count() <= self.max_distance:
+                    near[id(candidate)] = candidate
+
+        self.entries.append(fingerprint)
+        for key in keys:
+            self.buckets.setdefault(key, deque()).append(fingerprint)
+
+        flagged = next((candidate.cluster for candidate in near.values() if candidate.cluster), None)
+        if flagged:
+            fingerprint.cluster = flagged
+            _, batch = self.pending.setdefault(flagged, (text, []))
+            batch.append(fingerprint)
+            if len(batch) < self.max_batch:
+                return []
+            del self.pending[flagged]
+            return batch
+
+        cluster = list(near.values()) + [fingerprint]
+        if len({entry.user_id for entry in cluster}) < self.min_users:
+            return []
+        self.clusters += 1
+        for entry in cluster:
+            entry.cluster = self.clusters
+        return cluster
+
+    def take_pending(self) -> list:
+        """Returns and clears the queued copies of flagged clusters, as (text, fingerprints) per cluster."""
+        pending = list(self.pending.values())
+        self.pending.clear()
+        return pending
+
+    def expire(self, now: float) -> None:
+        while self.entries and (now - self.entries[0].time > self.window or len(self.entries) > self.max_entries):
+            oldest = self.entries.popleft()
+            for band in range(BANDS):
+                key = (band, (oldest.value >> (band * BAND_BITS)) & BAND_MASK)
+                bucket = self.buckets[key]
+                bucket.popleft()
+                if not bucket:
+                    del self.buckets[key]
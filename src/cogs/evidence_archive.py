@@ -0,0 +1,142 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+MAX_ARCHIVE_BYTES = 1024 * 1024 * 1024  # 1 GiB of blobs before the least recently used are evicted
+
+class EvidenceArchive:
+    """Local copy of evidence (deleted message attachments, report images).
+
+    Files are stored once per SHA-256 under evidence/blobs, so the same spam
+    image posted a hundred times takes up space once. A small SQLite index maps
+    a case ID (the deleted message's ID, or the report's case number) to its
+    blobs. When the archive outgrows `max_bytes` the least recently used blobs
+    are evicted. Everything here blocks, call it through asyncio.to_thread.
+    """
+
+    def __init__(self, root: str = "evidence", max_bytes: int = MAX_ARCHIVE_BYTES) -> None:
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(self.root, "blobs"), exist_ok=True)
+
+        self.db = sqlite3.connect(os.path.join(self.root, "index.db"), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            "hash TEXT PRIMARY KEY, "
+            "size INTEGER NOT NULL, "
+            "last_access INTEGER NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS evidence ("
+            "case_id INTEGER NOT NULL, "
+            "hash TEXT NOT NULL, "
+            "filename TEXT NOT NULL, "
+            "content_type TEXT, "
+            "created INTEGER NOT NULL, "
+            "PRIMARY KEY (case_id, hash, filename))"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS evidence_hash ON evidence (hash)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access)")
+        self.db.commit()
+        self.total_bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], digest)
+
+    def store(self, case_id: int, filename: str, content_type, data) -> str:
+        """Archives one file under a case, returns its content hash."""
+        def write(tmp_path):
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+        return self.add(case_id, filename, content_type, hashlib.sha256(data).hexdigest(), len(data), write)
+
+    def store_file(self, case_id: int, filename: str, content_type, source_path: str) -> str:
+        """Archives a file that's already on disk without reading it into memory, returns its content hash.
+
+        It's hashed a chunk at a time, then hard linked into the blobs, or
+        copied if the two are on different filesystems.
+        """
+        with open(source_path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+
+        def write(tmp_path):
+            try:
+                os.link(source_path, tmp_path)
+            except OSError:
+                shutil.copyfile(source_path, tmp_path)
+        return self.add(case_id, filename, content_type, digest, os.path.getsize(source_path), write)
+
+    def add(self, case_id: int, filename: str, content_type, digest: str, size: int, write) -> str:
+        """Files a blob under a case, calling `write(path)` to create it if it isn't stored yet."""
+        now = int(time.time())
+
+        with self.lock:
+            exists = self.db.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone()
+            if not exists:
+                path = self.blob_path(digest)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = path + ".tmp"
+                if os.path.exists(tmp_path):
+                    # Left over from a crash part way through
+                    os.remove(tmp_path)
+                write(tmp_path)
+                os.replace(tmp_path, path)
+                self.db.execute("INSERT INTO blobs (hash, size, last_access) VALUES (?, ?, ?)", (digest, size, now))
+                self.total_bytes += size
+            else:
+                self.db.execute("UPDATE blobs SET last_access = ? WHERE hash = ?", (now, digest))
+
+            self.db.execute(
+                "INSERT OR IGNORE INTO evidence (case_id, hash, filename, content_type, created) VALUES (?, ?, ?, ?, ?)",
+                (case_id, digest, filename, content_type, now)
+            )
+            self.db.commit()
+            self.evict()
+        return digest
+
+    def store_staged(self, case_id: int, staged_attachments) -> list:
+        """Archives everything an AttachmentStage downloaded; spooled ones go straight from their temp file."""
+        return [
+            self.store_file(case_id, staged.filename, staged.content_type, staged.path) if staged.path
+            else self.store(case_id, staged.filename, staged.content_type, staged.data)
+            for staged in staged_attachments
+        ]
+
+    def lookup(self, case_id: int) -> list:
+        """Returns (filename, content_type, path) for every file archived under a case."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT hash, filename, content_type FROM evidence WHERE case_id = ? ORDER BY created",
+                (case_id,)
+            ).fetchall()
+            if rows:
+                self.db.execute(
+                    f"UPDATE blobs SET last_access = ? WHERE hash IN ({','.join('?' * len(rows))})",
+                    (int(time.time()), *[row[0] for row in rows])
+                )
+                self.db.commit()
+        return [(filename, content_type, self.blob_path(digest)) for digest, filename, content_type in rows]
+
+    def evict(self) -> None:
+        # Caller holds the lock
+        while self.total_bytes > self.max_bytes:
+            row = self.db.execute("SELECT hash, size FROM blobs ORDER BY last_access LIMIT 1").fetchone()
+            if not row:
+                break
+            digest, size = row
+            self.db.execute("DELETE FROM blobs WHERE hash = ?", (digest,))
+            self.db.execute("DELETE FROM evidence WHERE hash = ?", (digest,))
+            try:
+                os.remove(self.blob_path(digest))
+            except FileNotFoundError:
+                pass
+            self.total_bytes -= size
+        self.db.commit()
+
+    def close(self) -> None:
+        self.db.close()
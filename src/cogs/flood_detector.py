@@ -0,0 +1,64 @@
+from array import array
+from collections import OrderedDict
+
+FLOOD_MESSAGES = 6          # This many messages...
+FLOOD_WINDOW = 5.0          # ...inside this many seconds, in one channel, is a flood
+IDLE_AFTER = 60.0           # Forget a (channel, user) pair after this long without a message
+MAX_TRACKED = 50_000        # Hard cap on tracked pairs, the least recently active go first
+
+class FloodDetector:
+    """Spots members sending messages too quickly in one channel.
+
+    Each (channel, user) pair keeps a ring buffer of its last
+    `max_messages - 1` message times. A new message overwrites the oldest
+    slot, and if that slot was written less than `window` seconds ago then
+    together with the new one the pair has sent `max_messages` messages within
+    the window, so recording is O(1) whatever the rate.
+
+    Pairs are kept in an OrderedDict by last activity (an update moves the pair
+    to the end), so idle pairs are always at the front and eviction only ever
+    looks there. Memory stays bounded by `max_tracked` pairs.
+    """
+
+    def __init__(self, max_messages: int = FLOOD_MESSAGES, window: float = FLOOD_WINDOW, idle_after: float = IDLE_AFTER, max_tracked: int = MAX_TRACKED) -> None:
+        if max_messages < 2:
+            raise ValueError("max_messages must be at least 2")
+        self.max_messages = max_messages
+        self.slots = max_messages - 1
+        self.window = window
+        self.idle_after = idle_after
+        self.max_tracked = max_tracked
+        # (channel_id, user_id) -> [ring position, array of message times, last message time]
+        self.tracked = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.tracked)
+
+    def record(self, channel_id: int, user_id: int, now: float) -> bool:
+        """Records a message, returns True when it completes a flood."""
+        key = (channel_id, user_id)
+        entry = self.tracked.get(key)
+        if entry is None:
+            entry = self.tracked[key] = [0, array("d", [float("-inf")]) * self.slots, now]
+        else:
+            self.tracked.move_to_end(key)
+
+        position, times = entry[0], entry[1]
+        oldest = times[position]
+        times[position] = now
+        entry[0] = (position + 1) % self.slots
+        entry[2] = now
+        self.evict(now)
+
+        if now - oldest <= self.window:
+            # Start over so the same burst isn't reported once per message
+            del self.tracked[key]
+            return True
+        return False
+
+    def evict(self, now: float) -> None:
+        while self.tracked:
+            key, entry = next(iter(self.tracked.items()))
+            if len(self.tracked) <= self.max_tracked and now - entry[2] < self.idle_after:
+                break
+            self.tracked.popitem(last=False)
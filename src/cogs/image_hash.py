@@ -0,0 +1,53 @@
+import math
+
+# Pillow is optional; without it uploads just aren't hashed
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+HASH_SIZE = 8           # 8x8 = 64 bit hashes
+DCT_SIZE = 32           # pHash works on a 32x32 thumbnail
+
+# DCT-II basis, only the rows for the low frequencies pHash keeps
+DCT_COS = [
+    [math.cos(math.pi * u * (2 * x + 1) / (2 * DCT_SIZE)) for x in range(DCT_SIZE)]
+    for u in range(HASH_SIZE)
+]
+
+def available() -> bool:
+    return Image is not None
+
+def bits_to_int(bits) -> int:
+    value = 0
+    for bit in bits:
+        value = (value << 1) | bool(bit)
+    return value
+
+def dhash(image) -> int:
+    """Difference hash: is each pixel brighter than its right neighbour, on a 9x8 thumbnail."""
+    small = image.resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS)
+    pixels = list(small.getdata())
+    width = HASH_SIZE + 1
+    return bits_to_int(
+        pixels[row * width + col] > pixels[row * width + col + 1]
+        for row in range(HASH_SIZE) for col in range(HASH_SIZE)
+    )
+
+def phash(image) -> int:
+    """Perceptual hash: the lowest 8x8 DCT frequencies of a 32x32 thumbnail, compared to their median."""
+    small = image.resize((DCT_SIZE, DCT_SIZE), Image.LANCZOS)
+    pixels = list(small.getdata())
+    rows = [pixels[y * DCT_SIZE:(y + 1) * DCT_SIZE] for y in range(DCT_SIZE)]
+
+    # Separable DCT, rows then columns, only computing the coefficients that are kept
+    row_freqs = [[sum(p * c for p, c in zip(row, DCT_COS[u])) for u in range(HASH_SIZE)] for row in rows]
+    coefficients = [
+        sum(DCT_COS[v][y] * row_freqs[y][u] for y in range(DCT_SIZE))
+        for v in range(HASH_SIZE) for u in range(HASH_SIZE)
+    ]
+    median = sorted(coefficients)[len(coefficients) // 2]
+    return bits_to_int(coefficient > median for coefficient in coefficients)
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
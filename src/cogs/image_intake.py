@@ -0,0 +1,85 @@
+import io
+
+from cogs.image_hash import Image, dhash, phash
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024     # Bigger uploads are turned away before downloading
+MAX_DIMENSION = 8000                    # Widest/tallest image accepted, in pixels
+MAX_PIXELS = 40_000_000                 # Decoded size cap, so a tiny file can't expand into gigabytes
+THUMBNAIL_SIZE = (320, 320)
+
+if Image is not None:
+    from PIL import ImageOps, UnidentifiedImageError
+    # Pillow refuses anything over twice this outright; intake() rejects anything over it
+    Image.MAX_IMAGE_PIXELS = MAX_PIXELS
+
+class ImageRejected(ValueError):
+    """The upload isn't an image we'll accept; the message is safe to show the user."""
+
+class IntakeResult:
+    """A checked upload: the image re-encoded without metadata, plus a small thumbnail."""
+
+    def __init__(self, data: bytes, extension: str, thumbnail: bytes, thumbnail_extension: str, size: tuple, hashes) -> None:
+        self.data = data
+        self.extension = extension
+        self.thumbnail = thumbnail
+        self.thumbnail_extension = thumbnail_extension
+        self.size = size
+        self.hashes = hashes
+
+def encode(image) -> tuple:
+    """Re-encodes an image with nothing but its pixels (and colour profile), returns (bytes, extension)."""
+    out = io.BytesIO()
+    icc_profile = image.info.get("icc_profile")
+    if image.mode in ("RGB", "L") and image.format != "PNG":
+        image.save(out, "JPEG", quality=90, icc_profile=icc_profile)
+        return out.getvalue(), "jpg"
+    if image.mode not in ("RGB", "RGBA", "L", "LA"):
+        image = image.convert("RGBA")
+    image.save(out, "PNG", optimize=True, icc_profile=icc_profile)
+    return out.getvalue(), "png"
+
+def intake(data: bytes, with_hashes: bool = False) -> IntakeResult:
+    """Verifies and sanitizes an uploaded image. Runs in the image pool's worker processes.
+
+    Raises ImageRejected for anything that isn't a decodable image within the
+    size limits. Animated images keep their first frame only.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is not installed")
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise ImageRejected(f"Images can be at most {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.")
+
+    try:
+        # verify() checks the file's structure without decoding it, then the image has to be reopened
+        with Image.open(io.BytesIO(data)) as probe:
+            probe.verify()
+        with Image.open(io.BytesIO(data)) as image:
+            width, height = image.size
+            if width > MAX_DIMENSION or height > MAX_DIMENSION or width * height > MAX_PIXELS:
+                raise ImageRejected(f"Images can be at most {MAX_DIMENSION} pixels on a side and {MAX_PIXELS // 1_000_000} megapixels.")
+            image.load()
+            source_format = image.format
+            # Bake the EXIF rotation into the pixels before the EXIF block is dropped
+            clean = ImageOps.exif_transpose(image)
+    except ImageRejected:
+        raise
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError, ValueError) as e:
+        raise ImageRejected("That file couldn't be read as an image.") from e
+
+    clean.format = source_format
+    clean.info = {"icc_profile": image.info.get("icc_profile")} if image.info.get("icc_profile") else {}
+    sanitized, extension = encode(clean)
+    if len(sanitized) > MAX_UPLOAD_BYTES:
+        raise ImageRejected(f"Images can be at most {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.")
+
+    thumbnail = clean.copy()
+    thumbnail.thumbnail(THUMBNAIL_SIZE)
+    thumbnail.format = source_format
+    thumbnail_data, thumbnail_extension = encode(thumbnail)
+
+    hashes = None
+    if with_hashes:
+        gray = clean.convert("L")
+        hashes = (phash(gray), dhash(gray))
+
+    return IntakeResult(sanitized, extension, thumbnail_data, thumbnail_extension, (width, height), hashes)
@@ -0,0 +1,52 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+IMAGE_WORKERS = 2   # Processes for decoding and hashing images
+MAX_PENDING = 8     # Jobs queued or running at once, later uploads wait their turn
+
+class ImagePool:
+    """Runs CPU-heavy image work in worker processes, off the event loop.
+
+    Decoding and hashing an upload holds the GIL for tens of milliseconds, long
+    enough to stall every other handler, so it runs in a ProcessPoolExecutor
+    instead. The pool is started on first use. At most `max_pending` jobs are
+    handed to it at once, so a burst of uploads waits here rather than piling
+    up pickled images in the executor's queue. Callers download the input
+    inside `reserve`, so queued uploads aren't held in memory either.
+
+    Workers come from a forkserver (spawn where there's none): forking the bot
+    itself would copy the strike writer's and other threads' locks mid-use. If
+    a worker dies, say on an image that crashes the decoder, the executor
+    refuses every job after it, so it's replaced and the job that hit it fails
+    with BrokenProcessPool.
+    """
+
+    def __init__(self, workers: int = IMAGE_WORKERS, max_pending: int = MAX_PENDING) -> None:
+        self.workers = workers
+        self.executor = None
+        self.semaphore = asyncio.Semaphore(max_pending)
+
+    def reserve(self) -> asyncio.Semaphore:
+        """One of the `max_pending` slots, to hold while downloading a job's input and passing it to `submit`."""
+        return self.semaphore
+
+    async def submit(self, func, *args):
+        """Runs func(*args) in a worker process; the caller must already hold a slot from `reserve`."""
+        if self.executor is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(method))
+        executor = self.executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            # Every job in flight fails together, only the first one replaces the pool
+            if self.executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+            raise
+
+    def close(self) -> None:
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
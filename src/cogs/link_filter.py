@@ -0,0 +1,219 @@
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from typing import Optional
+
+MAGIC = b"LNK1"
+HEADER = struct.Struct("<4sII")     # magic, number of domains, domains per block
+BLOCK_SIZE = 32                     # Domains between index entries
+
+# One pass pulls every host out of a message: full URLs, bare domains and
+# userinfo tricks like https://discord.com@evil.example all yield the real host
+URL_PATTERN = re.compile(
+    r"(?<![\w.@-])"
+    r"(?:https?://)?"
+    r"(?:[^\s/@]{1,64}@)?"
+    r"((?:[^\W_](?:[\w-]{0,61}[^\W_])?\.)+(?:[^\W\d_]{2,63}|xn--[a-z0-9-]{1,59}))"
+    r"(?![\w-])",
+    re.IGNORECASE
+)
+
+def domain_key(domain: str) -> Optional[bytes]:
+    """Turns a domain into its lookup key: ASCII, lowercased, labels reversed, trailing dot.
+
+    `Evil.Example.com` becomes `com.example.evil.`, so every subdomain of a
+    blocked domain sorts right after it and starts with its key. Unicode
+    domains go through IDNA so look-alikes match their punycode entries.
+    Returns None for anything that isn't a usable domain.
+    """
+    domain = domain.strip().strip(".").lower()
+    if domain.startswith("*."):
+        domain = domain[2:]
+    if not domain.isascii():
+        try:
+            domain = domain.encode("idna").decode("ascii")
+        except UnicodeError:
+            return None
+    labels = domain.split(".")
+    # A bare TLD would block far more than anyone meant to
+    if len(labels) < 2 or not all(labels):
+        return None
+    return (".".join(reversed(labels)) + ".").encode("ascii")
+
+def key_domain(key: bytes) -> str:
+    return ".".join(reversed(key.decode("ascii").rstrip(".").split(".")))
+
+def parse_domains(lines):
+    """Yields the lookup key of every domain in a text blocklist.
+
+    One domain per line; `example.com` and `*.example.com` both block the
+    domain and everything under it. Hosts-file lines (`0.0.0.0 example.com`)
+    work too, so published phishing lists can be used as they are. Blank lines
+    and # comments are skipped.
+    """
+    for line in lines:
+        line = line.split("#", 1)[0].split()
+        if not line:
+            continue
+        key = domain_key(line[-1])
+        if key:
+            yield key
+
+class DomainTable:
+    """A sorted table of domain keys packed into one bytes blob, searched with bisect.
+
+    It works as an implicit trie over reversed labels: everything under
+    `com.example.` sorts between that key and the next, so the nearest key at
+    or before a host's key is the only one that can block it. Keys already
+    covered by a parent domain are dropped when the table is built, which is
+    what makes that single search enough.
+
+    The blob is every key followed by a newline. Only the first key of each
+    block of `block_size` is kept as an object, in `index`; a lookup bisects
+    that, splits the one block it lands in and bisects again, both in C. An
+    entry costs its length plus a byte, and the table is saved and loaded as
+    the blob and block offsets, with nothing to parse.
+    """
+
+    def __init__(self, blob: bytes = b"", count: int = 0, block_offsets: array = None, block_size: int = BLOCK_SIZE) -> None:
+        self.blob = blob
+        self.count = count
+        self.block_size = block_size
+        # Where each block starts in the blob, plus the blob's end
+        self.block_offsets = block_offsets if block_offsets is not None else array("I", [0])
+        self.index = [blob[start:blob.index(b"\n", start)] for start in self.block_offsets[:-1]]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self):
+        return iter(self.blob.split(b"\n")[:-1])
+
+    @classmethod
+    def build(cls, keys, block_size: int = BLOCK_SIZE) -> "DomainTable":
+        kept = []
+        for key in sorted(set(keys)):
+            # Sorted, a subdomain always comes right after whatever covers it
+            if kept and key.startswith(kept[-1]):
+                continue
+            kept.append(key)
+        block_offsets = array("I")
+        position = 0
+        for i, key in enumerate(kept):
+            if i % block_size == 0:
+                block_offsets.append(position)
+            position += len(key) + 1
+        block_offsets.append(position)
+        return cls(b"".join(key + b"\n" for key in kept), len(kept), block_offsets, block_size)
+
+    def lookup(self, key: bytes) -> Optional[bytes]:
+        """Returns the entry that blocks `key` (itself or a parent domain), or None."""
+        block = bisect_right(self.index, key) - 1
+        if block < 0:
+            return None
+        entries = self.blob[self.block_offsets[block]:self.block_offsets[block + 1] - 1].split(b"\n")
+        entry = entries[bisect_right(entries, key) - 1]
+        return entry if key.startswith(entry) else None
+
+    def to_bytes(self) -> bytes:
+        block_offsets = array("I", self.block_offsets)
+        if sys.byteorder == "big":
+            block_offsets.byteswap()
+        return HEADER.pack(MAGIC, self.count, self.block_size) + block_offsets.tobytes() + self.blob
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "DomainTable":
+        if len(data) < HEADER.size:
+            raise ValueError("compiled blocklist is truncated")
+        magic, count, block_size = HEADER.unpack_from(data)
+        if magic != MAGIC or not block_size:
+            raise ValueError("not a compiled link blocklist")
+        block_offsets = array("I")
+        end = HEADER.size + (-(-count // block_size) + 1) * block_offsets.itemsize
+        if len(data) < end:
+            raise ValueError("compiled blocklist is truncated")
+        block_offsets.frombytes(data[HEADER.size:end])
+        if sys.byteorder == "big":
+            block_offsets.byteswap()
+        blob = data[end:]
+        if block_offsets[-1] != len(blob):
+            raise ValueError("compiled blocklist is truncated")
+        return cls(blob, count, block_offsets, block_size)
+
+def compile_blocklist(path: str, compiled_path: str) -> int:
+    """Compiles the text blocklist at `path` into `compiled_path`, returns the number of entries kept."""
+    with open(path, encoding="utf-8") as f:
+        table = DomainTable.build(parse_domains(f))
+    tmp_path = compiled_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(table.to_bytes())
+    os.replace(tmp_path, compiled_path)
+    return len(table)
+
+def load_blocklist(compiled_path: str) -> DomainTable:
+    with open(compiled_path, "rb") as f:
+        return DomainTable.from_bytes(f.read())
+
+def mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+class LinkFilter:
+    """Checks the links in messages against the domain blocklist.
+
+    `path` is the text list (see parse_domains). It's compiled into
+    `compiled_path`, which is what actually gets loaded: reading it is a copy
+    into an array, not a parse, so even a few hundred thousand domains load
+    instantly. `reload` recompiles when the text list is newer than the
+    compiled file and swaps in a new table; compiling a big list takes a
+    moment, so it's meant to be called off the event loop. The compiled file
+    can also be built elsewhere with links_cli.py and used with `path=None`.
+    """
+
+    def __init__(self, path: Optional[str] = "link_blocklist.txt", compiled_path: str = "link_blocklist.bin") -> None:
+        self.path = os.path.abspath(path) if path else None
+        self.compiled_path = os.path.abspath(compiled_path)
+        self.table = DomainTable()
+        self.mtime = None
+        self.source_mtime = None
+        self.reload()
+
+    def reload(self) -> bool:
+        """Recompiles and reloads the blocklist if either file changed, returns True if it did."""
+        source_mtime = mtime(self.path) if self.path else None
+        compiled_mtime = mtime(self.compiled_path)
+        try:
+            # Remember the attempt so a broken list is reported once, not every interval
+            if source_mtime is not None and source_mtime != self.source_mtime and (compiled_mtime is None or source_mtime > compiled_mtime):
+                self.source_mtime = source_mtime
+                compile_blocklist(self.path, self.compiled_path)
+                compiled_mtime = mtime(self.compiled_path)
+            if compiled_mtime == self.mtime:
+                return False
+            table = DomainTable() if compiled_mtime is None else load_blocklist(self.compiled_path)
+        except (OSError, ValueError) as e:
+            print(f"Couldn't load link blocklist {self.compiled_path}: {e}")
+            self.mtime = compiled_mtime
+            return False
+
+        self.table = table
+        self.mtime = compiled_mtime
+        return True
+
+    def check(self, text: str) -> Optional[str]:
+        """Returns the blocked domain a link in `text` falls under, or None."""
+        table = self.table
+        if not len(table) or "." not in text:
+            return None
+        for match in URL_PATTERN.finditer(text):
+            key = domain_key(match.group(1))
+            if key:
+                entry = table.lookup(key)
+                if entry:
+                    return key_domain(entry)
+        return None
@@ -0,0 +1,102 @@
+import asyncio
+import discord
+from cogs.ids import *
+
+EMBEDS_PER_MESSAGE = 10     # Discord's limit per message
+CHARS_PER_MESSAGE = 6000    # Discord's limit on total embed text per message
+
+class LogWriter:
+    """The one place embeds get posted to the log channel.
+
+    Cogs queue embeds with `send`; a single writer task drains the queue and
+    packs whatever is already waiting (up to 10 embeds) into one message. A
+    lone embed goes out straight away; embeds that queue up while a send is in
+    flight go out together in the next one. During a raid that turns dozens of
+    log sends into a few, and only one request to the channel is ever in
+    flight. The queue is bounded, so callers wait when it's full instead of
+    piling up memory.
+    """
+
+    def __init__(self, bot, channel_id: int = LOG_CHANNEL_ID, max_queue: int = 500) -> None:
+        self.bot = bot
+        self.channel_id = channel_id
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.held = None
+        self.flushing = False
+        self.task = None
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self.run())
+
+    async def send(self, embed: discord.Embed, standalone: bool = False, files: list = None) -> asyncio.Future:
+        """Queues an embed, returns a future for the log message it ends up in.
+
+        `standalone` gives the embed a message to itself, for callers that
+        start a thread on it. Embeds with `files` always get their own message.
+        """
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(self.report_failure)
+        await self.queue.put((embed, standalone or bool(files), future, files))
+        return future
+
+    def report_failure(self, future: asyncio.Future) -> None:
+        # Reading the exception here also stops asyncio warning about fire-and-forget sends
+        if not future.cancelled() and future.exception():
+            print(f"Failed to write to log channel: {future.exception()}")
+
+    async def next_item(self):
+        if self.held:
+            item, self.held = self.held, None
+            return item
+        return await self.queue.get()
+
+    async def run(self) -> None:
+        while True:
+            batch = [await self.next_item()]
+            size = len(batch[0][0])
+
+            # Fill the message with what's already queued, until it's full or a standalone embed shows up
+            while not batch[0][1] and len(batch) < EMBEDS_PER_MESSAGE and not self.queue.empty():
+                item = self.queue.get_nowait()
+                if item[1] or size + len(item[0]) > CHARS_PER_MESSAGE:
+                    self.held = item
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            self.flushing = True
+            try:
+                await self.flush(batch)
+            finally:
+                self.flushing = False
+
+    async def flush(self, batch: list) -> None:
+        try:
+            log_channel = self.bot.get_channel(self.channel_id)
+            if not log_channel:
+                raise LookupError(f"Log channel with ID {self.channel_id} not found")
+            message = await log_channel.send(embeds=[embed for embed, _, _, _ in batch], files=batch[0][3] or [])
+        except Exception as e:
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for _, _, future, _ in batch:
+            if not future.done():
+                future.set_result(message)
+
+    async def close(self, timeout: float = 5) -> None:
+        """Gives queued embeds a chance to go out, then stops the writer."""
+        if not self.task:
+            return
+        try:
+            await asyncio.wait_for(self.drain(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.task.cancel()
+
+    async def drain(self) -> None:
+        # Includes the batch that's currently being written
+        while not self.queue.empty() or self.held or self.flushing:
+            await asyncio.sleep(0.1)
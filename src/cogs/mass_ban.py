@@ -0,0 +1,73 @@
+import discord
+import re
+from datetime import timedelta
+from cogs.ids import *
+
+BULK_BAN_CHUNK = 200    # Most users Discord's bulk ban endpoint takes per request
+
+USER_ID_PATTERN = re.compile(r"\d{15,20}")
+
+def parse_user_ids(text: str) -> list:
+    """Pulls user IDs out of pasted text (IDs, mentions, commas, newlines), keeping order, without repeats."""
+    return list(dict.fromkeys(int(match) for match in USER_ID_PATTERN.findall(text or "")))
+
+def recent_roleless_members(guild: discord.Guild, minutes: int, now=None) -> list:
+    """Members who joined in the last `minutes` and have no roles yet, the usual shape of a raid."""
+    cutoff = (now or discord.utils.utcnow()) - timedelta(minutes=minutes)
+    return [
+        member.id for member in guild.members
+        if not member.bot
+        and member.joined_at and member.joined_at >= cutoff
+        and len(member.roles) <= 1  # Just @everyone
+    ]
+
+def outranks(member: discord.Member, guild: discord.Guild, moderator: discord.Member = None) -> bool:
+    """True if role hierarchy stops the bot, or the moderator running the command, from banning `member`."""
+    if member.id == guild.owner_id or member.top_role >= guild.me.top_role:
+        return True
+    return moderator is not None and moderator.id != guild.owner_id and member.top_role >= moderator.top_role
+
+class MassBanResult:
+    def __init__(self) -> None:
+        self.banned = []
+        self.failed = []
+        self.protected = []
+        self.outranked = []
+
+    @property
+    def total(self) -> int:
+        return len(self.banned) + len(self.failed) + len(self.protected) + len(self.outranked)
+
+async def mass_ban(guild: discord.Guild, user_ids: list, reason: str, progress=None, exclude=(), moderator: discord.Member = None, chunk_size: int = BULK_BAN_CHUNK) -> MassBanResult:
+    """Bans every user in `user_ids` through the bulk ban endpoint, `chunk_size` at a time.
+
+    Members with a protected role (and anyone in `exclude`) are left alone, and
+    so is anyone at or above the bot's or `moderator`'s top role, instead of
+    letting Discord fail them. A chunk that errors counts as failed and the
+    rest carry on. `progress`, if given, is awaited with the running result
+    after every chunk.
+    """
+    result = MassBanResult()
+    targets = []
+    for user_id in user_ids:
+        member = guild.get_member(user_id)
+        if user_id in exclude or (member and any(role.id in PROTECTED_ROLE_IDS for role in member.roles)):
+            result.protected.append(user_id)
+        elif member and outranks(member, guild, moderator):
+            result.outranked.append(user_id)
+        else:
+            targets.append(user_id)
+
+    for start in range(0, len(targets), chunk_size):
+        chunk = targets[start:start + chunk_size]
+        try:
+            bulk = await guild.bulk_ban([discord.Object(id=user_id) for user_id in chunk], reason=reason, delete_message_seconds=0)
+            result.banned.extend(user.id for user in bulk.banned)
+            result.failed.extend(user.id for user in bulk.failed)
+        except discord.HTTPException:
+            result.failed.extend(chunk)
+
+        if progress:
+            await progress(result, len(targets))
+
+    return result
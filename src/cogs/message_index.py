@@ -0,0 +1,75 @@
+import discord
+import os
+from array import array
+from typing import Optional
+
+from cogs.message_search import readable_channels, search_channels
+
+class MessageIndex:
+    """Remembers which channel recent messages were sent in.
+
+    Fed from on_message, capped at `max_entries` (oldest messages are dropped
+    first) and saved to disk as a flat array of (message_id, channel_id) pairs
+    so it survives restarts. Looking a message up then takes one fetch instead
+    of trying every channel in the guild.
+    """
+
+    def __init__(self, path: str = "message_index.bin", max_entries: int = 100_000) -> None:
+        self.path = os.path.abspath(path)
+        self.max_entries = max_entries
+        # Plain dicts keep insertion order, and message IDs arrive oldest first
+        self.channels = {}
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    def record(self, message_id: int, channel_id: int) -> None:
+        self.channels[message_id] = channel_id
+        while len(self.channels) > self.max_entries:
+            del self.channels[next(iter(self.channels))]
+
+    def get(self, message_id: int) -> Optional[int]:
+        return self.channels.get(message_id)
+
+    def forget(self, message_id: int) -> None:
+        self.channels.pop(message_id, None)
+
+    def load(self) -> None:
+        pairs = array("Q")
+        try:
+            with open(self.path, "rb") as f:
+                pairs.frombytes(f.read())
+        except (FileNotFoundError, ValueError):
+            return
+        for i in range(0, len(pairs) - 1, 2):
+            self.record(pairs[i], pairs[i + 1])
+
+    def save(self) -> None:
+        pairs = array("Q")
+        for message_id, channel_id in list(self.channels.items()):
+            pairs.append(message_id)
+            pairs.append(channel_id)
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pairs.tofile(f)
+        os.replace(tmp_path, self.path)
+
+    async def find(self, guild: discord.Guild, message_id: int) -> Optional[discord.Message]:
+        """Fetches a message from the channel it was indexed in, or searches every readable text channel."""
+        channel_id = self.get(message_id)
+        if channel_id:
+            channel = guild.get_channel_or_thread(channel_id)
+            if channel:
+                try:
+                    return await channel.fetch_message(message_id)
+                except discord.NotFound:
+                    self.forget(message_id)
+                except (discord.Forbidden, discord.HTTPException):
+                    pass
+
+        msg = await search_channels(readable_channels(guild), message_id)
+        if msg:
+            self.record(message_id, msg.channel.id)
+        return msg
@@ -0,0 +1,52 @@
+import asyncio
+import discord
+from typing import Optional
+
+# Each channel's fetch_message has its own rate-limit bucket, so a handful in flight
+# at once is fine; the cap keeps a big guild from tripping the global limit
+SEARCH_CONCURRENCY = 8
+
+def search_order(channels, message_id: int) -> list:
+    """Orders channels so the ones most likely to hold the message are tried first.
+
+    A channel whose last message is older than `message_id` can't contain it, so
+    those go to the back (they're still tried in case the cached ID is stale).
+    The rest are sorted by most recent activity.
+    """
+    def key(channel):
+        last_id = channel.last_message_id or 0
+        return (channel.last_message_id is not None and last_id < message_id, -last_id)
+    return sorted(channels, key=key)
+
+async def search_channels(channels, message_id: int, concurrency: int = SEARCH_CONCURRENCY) -> Optional[discord.Message]:
+    """Fetches a message from whichever channel has it, querying several channels at once.
+
+    As soon as one channel returns the message every outstanding request is cancelled.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe(channel):
+        async with semaphore:
+            try:
+                return await channel.fetch_message(message_id)
+            except (discord.NotFound, discord.Forbidden, discord.HTTPException):
+                return None
+
+    # Semaphore waiters are woken in order, so channels are still tried most likely first
+    tasks = [asyncio.create_task(probe(channel)) for channel in search_order(channels, message_id)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            msg = await next_done
+            if msg:
+                return msg
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def readable_channels(guild: discord.Guild) -> list:
+    """Text channels the bot is allowed to read history in."""
+    return [
+        channel for channel in guild.text_channels
+        if channel.permissions_for(guild.me).read_message_history
+    ]
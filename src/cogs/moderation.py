@@ -1,18 +1,51 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 from cogs.ids import *
+from cogs.attachment_staging import AttachmentStage
+from cogs.dispatch import ActionDispatch, send_log
+from cogs.mass_ban import mass_ban, parse_user_ids, recent_roleless_members
+from cogs.message_search import readable_channels
+from cogs.purge import MAX_PURGE_MINUTES, collect_messages, delete_in_chunks, for_each_channel, transcript
 from datetime import timedelta, datetime, timezone
 from typing import Optional
-import json
+import asyncio
+import io
 import os
 
 class ModerationCog(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
+        self.reconcile_bans.start()
+
+    def cog_unload(self) -> None:
+        self.reconcile_bans.cancel()
 
     mod = app_commands.Group(name="mod", description="Jira Moderation commands")
 
+    @tasks.loop(hours=6)
+    async def reconcile_bans(self):
+        # The first run builds the ban index, later runs catch anything missed while disconnected
+        for guild in self.bot.guilds:
+            try:
+                missing, stale = await self.bot.bans.reconcile(guild)
+                if missing or stale:
+                    print(f"Ban index for {guild.name}: added {missing}, removed {stale}")
+            except discord.HTTPException as e:
+                print(f"Couldn't fetch bans for {guild.name}: {e}")
+
+    @reconcile_bans.before_loop
+    async def before_reconcile_bans(self):
+        await self.bot.wait_until_ready()
+
+    @commands.Cog.listener()
+    async def on_member_ban(self, guild: discord.Guild, user: discord.User):
+        self.bot.bans.add(guild.id, user.id)
+
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild: discord.Guild, user: discord.User):
+        self.bot.bans.remove(guild.id, user.id)
+
     def parse_duration(self, duration_str: str) -> Optional[timedelta]:
         """Parses duration strings like '10m', '2h', '1d' into timedelta."""
         try:
@@ -31,45 +64,6 @@ class ModerationCog(commands.Cog):
         except:
             return None
         
-    def load_strikes(self):
-        # Safe JSON loader (with empty file check)
-        try:
-            with open(os.path.abspath("./strikes.json"), "r") as f:
-                data = f.read().strip()
-                if not data:
-                    return {}
-                return json.loads(data)
-        except (FileNotFoundError, json.JSONDecodeError):
-            with open(os.path.abspath("./strikes.json"), "w") as f:
-                json.dump({}, f)
-            return {}
-
-    def save_strikes(self, data):
-        with open(os.path.abspath("./strikes.json"), "w") as f:
-            json.dump(data, f, indent=4)
-
-    def clean_expired_strikes(self, data):
-        now = datetime.now(timezone.utc)
-        updated = False
-
-        for guild_id in list(data.keys()):
-            for user_id in list(data[guild_id].keys()):
-                original_len = len(data[guild_id][user_id])
-                data[guild_id][user_id] = [
-                    strike for strike in data[guild_id][user_id]
-                    if datetime.fromisoformat(strike["timestamp"]) > now - timedelta(days=30)
-                ]
-                if not data[guild_id][user_id]:
-                    del data[guild_id][user_id]
-                if len(data.get(guild_id, {}).get(user_id, [])) != original_len:
-                    updated = True
-            if not data[guild_id]:
-                del data[guild_id]
-                updated = True
-
-        return updated
-
-
     @mod.command(name="ban", description="Ban a member from the server.")
     async def ban(self, interaction: discord.Interaction, member: discord.Member, reason: str, message: str = "No additional message provided", silent: bool = True):
         await interaction.response.send_message("Banning member...", ephemeral=True)
@@ -97,34 +91,106 @@ class ModerationCog(commands.Cog):
         embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
         embed.timestamp = discord.utils.utcnow()
 
-        # Try to DM the user
-        try:
-            await member.send(embed=embed)
-        except discord.Forbidden:
-            await interaction.followup.send(f"{WARNING_EMOJI} Couldn't DM {member.mention}. They might have DMs disabled.", ephemeral=True)
-            #return
+        # DM the user first, they can't be messaged once they're banned
+        dispatch = ActionDispatch()
+        await dispatch.first("DM", member.send(embed=embed))
         
         # Try banning the user
         try:
             await member.ban(reason=reason,delete_message_seconds=0)
 
-            await interaction.followup.send(embed=embed, ephemeral=True)
-
+            # Public embed and log channel don't depend on each other, send both at once
+            steps = {"Log": send_log(self.bot, embed=embed)}
             if silent is False:
-                await interaction.followup.send(embed=embed)
+                steps["Public"] = interaction.followup.send(embed=embed)
+            await dispatch.together(steps)
 
-            # Send to log channel
-            log_channel = self.bot.get_channel(LOG_CHANNEL_ID)
-            if log_channel:
-                await log_channel.send(embed=embed)
-            else:
-                await interaction.followup.send(f"{WARNING_EMOJI} Log channel with ID {LOG_CHANNEL_ID} not found.", ephemeral=True)
+            await interaction.followup.send(dispatch.summary(), embed=embed, ephemeral=True)
 
         except discord.Forbidden:
             await interaction.followup.send(f"{X_EMOJI} I don't have permission to ban this user.", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"{X_EMOJI} An unexpected error occurred: {str(e)}", ephemeral=True)
 
+    @mod.command(name="massban", description="Ban many accounts at once, by ID list or by recent joins.")
+    async def massban(self, interaction: discord.Interaction, reason: str, user_ids: str = None, joined_within_minutes: int = None):
+        await interaction.response.send_message("Collecting accounts...", ephemeral=True)
+        author_roles = [role.id for role in interaction.user.roles]
+
+        # Check if the user has the authorized role
+        if MOD_ROLE_ID not in author_roles:
+            await interaction.followup.send(f"{X_EMOJI} You don't have permission to use this command.", ephemeral=True)
+            return
+
+        targets = parse_user_ids(user_ids)
+        if joined_within_minutes:
+            targets = list(dict.fromkeys(targets + recent_roleless_members(interaction.guild, joined_within_minutes)))
+
+        if not targets:
+            await interaction.edit_original_response(content=f"{WARNING_EMOJI} No accounts matched. Pass user IDs and/or how many minutes back to look for joins without roles.")
+            return
+
+        async def report_progress(result, total):
+            done = len(result.banned) + len(result.failed)
+            await interaction.edit_original_response(content=f"{HOURGLASS_EMOJI} Banning... {done}/{total}")
+
+        try:
+            result = await mass_ban(
+                interaction.guild, targets, reason,
+                progress=report_progress,
+                exclude={interaction.user.id, self.bot.user.id},
+                moderator=interaction.user
+            )
+        except Exception as e:
+            await interaction.edit_original_response(content=f"{X_EMOJI} An unexpected error occurred: {str(e)}")
+            return
+
+        banned = " ".join(f"<@{user_id}>" for user_id in result.banned) or "None"
+        if len(banned) > 3500:
+            banned = banned[:3500].rsplit(" ", 1)[0] + "\n... *(truncated)*"
+
+        embed = discord.Embed(
+            title=f"{LOCK_EMOJI} Mass Ban",
+            description=f"**Banned:** {len(result.banned)}\n**Failed:** {len(result.failed)}\n**Skipped (protected):** {len(result.protected)}\n**Skipped (higher role):** {len(result.outranked)}\n**Reason:** {reason}\n**Moderator:** {interaction.user.mention}\n\n{banned}",
+            color=discord.Color.red()
+        )
+        embed.timestamp = discord.utils.utcnow()
+
+        # One log entry for the whole batch instead of one per account
+        dispatch = ActionDispatch()
+        await dispatch.together({"Log": send_log(self.bot, embed=embed)})
+
+        await interaction.edit_original_response(
+            content=f"{CHECK_EMOJI} Banned {len(result.banned)}/{result.total} · {dispatch.summary()}",
+            embed=embed
+        )
+
+    @mod.command(name="lockdown", description="Start or end raid lockdown, new joiners get timed out while it's on.")
+    async def lockdown(self, interaction: discord.Interaction, enabled: bool):
+        await interaction.response.send_message("Updating lockdown...", ephemeral=True)
+        author_roles = [role.id for role in interaction.user.roles]
+
+        # Check if the user has the authorized role
+        if MOD_ROLE_ID not in author_roles:
+            await interaction.followup.send(f"{X_EMOJI} You don't have permission to use this command.", ephemeral=True)
+            return
+
+        if enabled:
+            self.bot.raids.start_lockdown(interaction.guild.id)
+        else:
+            self.bot.raids.end_lockdown(interaction.guild.id)
+
+        embed = discord.Embed(
+            title=f"{LOCK_EMOJI} Lockdown Started" if enabled else f"{UNLOCK_EMOJI} Lockdown Ended",
+            description=f"**Moderator:** {interaction.user.mention}",
+            color=discord.Color.red() if enabled else discord.Color.green()
+        )
+        embed.timestamp = discord.utils.utcnow()
+
+        dispatch = ActionDispatch()
+        await dispatch.together({"Log": send_log(self.bot, embed=embed)})
+        await interaction.followup.send(dispatch.summary(), embed=embed, ephemeral=True)
+
     @mod.command(name="pardon", description="Unban a user from the server.")
     async def pardon(self, interaction: discord.Interaction, user_id: str, silent: bool = True):
         await interaction.response.send_message("Unbanning member...", ephemeral=True)
@@ -137,19 +203,29 @@ class ModerationCog(commands.Cog):
 
         try:
             # Check if user is banned
-            banned_user = None
-            async for ban in interaction.guild.bans():
-                if ban.user.id == int(user_id):
-                    banned_user = ban
-                    break
+            user_id_int = int(user_id)
+            banned = self.bot.bans.is_banned(interaction.guild.id, user_id_int)
+            if banned is None:
+                # Ban list hasn't been indexed yet, ask about just this user
+                try:
+                    await interaction.guild.fetch_ban(discord.Object(id=user_id_int))
+                    banned = True
+                except discord.NotFound:
+                    banned = False
 
-            if banned_user is None:
+            if not banned:
                 await interaction.followup.send(f"{WARNING_EMOJI} This user is not banned.", ephemeral=True)
                 return
 
             # Unban the user
-            user = await self.bot.fetch_user(user_id)
-            await interaction.guild.unban(user)
+            user = self.bot.get_user(user_id_int) or await self.bot.fetch_user(user_id_int)
+            try:
+                await interaction.guild.unban(user)
+            except discord.NotFound:
+                self.bot.bans.remove(interaction.guild.id, user_id_int)
+                await interaction.followup.send(f"{WARNING_EMOJI} This user is not banned.", ephemeral=True)
+                return
+            self.bot.bans.remove(interaction.guild.id, user_id_int)
 
             # Create the embed
             embed = discord.Embed(
@@ -160,23 +236,46 @@ class ModerationCog(commands.Cog):
             embed.set_thumbnail(url=user.avatar.url if user.avatar else user.default_avatar.url)
             embed.timestamp = discord.utils.utcnow()
 
-            await interaction.followup.send(embed=embed, ephemeral=True)
-
+            dispatch = ActionDispatch()
+            steps = {"Log": send_log(self.bot, embed=embed)}
             if silent is False:
-                await interaction.followup.send(embed=embed)
+                steps["Public"] = interaction.followup.send(embed=embed)
+            await dispatch.together(steps)
 
-            # Send embed to log channel
-            log_channel = self.bot.get_channel(LOG_CHANNEL_ID)
-            if log_channel:
-                await log_channel.send(embed=embed)
-            else:
-                await interaction.followup.send(f"{WARNING_EMOJI} Log channel with ID {LOG_CHANNEL_ID} not found.", ephemeral=True)
+            await interaction.followup.send(dispatch.summary(), embed=embed, ephemeral=True)
 
         except discord.Forbidden:
             await interaction.followup.send(f"{X_EMOJI} I don't have permission to unban this user.", ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"{X_EMOJI} An unexpected error occurred: {str(e)}", ephemeral=True)
 
+    async def apply_timeout(self, member: discord.Member, timeout_duration: timedelta, duration: str, reason: str, message: str, moderator: str, public=None) -> tuple:
+        """Times a member out, then DMs them and logs it. Returns (embed, dispatch).
+
+        Shared by /mod timeout and AutoMod. `public`, if given, is called with the
+        embed to post it publicly too. Raises discord.Forbidden when the bot isn't
+        allowed to time the member out.
+        """
+        until = discord.utils.utcnow() + timeout_duration
+        await member.timeout(until, reason=reason)
+
+        # Create the embed
+        embed = discord.Embed(
+            title=f"{HOURGLASS_EMOJI} User Timed Out",
+            description=f"**User:** {member.mention}\n**Duration:** {duration}\n**Reason:** {reason}\n**Message:** {message}\n**Moderator:** {moderator}",
+            color=discord.Color.orange()
+        )
+        embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
+        embed.timestamp = discord.utils.utcnow()
+
+        # They stay in the server, so the DM can go out alongside everything else
+        dispatch = ActionDispatch()
+        steps = {"DM": member.send(embed=embed), "Log": send_log(self.bot, embed=embed)}
+        if public:
+            steps["Public"] = public(embed=embed)
+        await dispatch.together(steps)
+        return embed, dispatch
+
     @mod.command(name="timeout", description="Temporarily timeout a member.")
     async def timeout(self, interaction: discord.Interaction, member: discord.Member, duration: str, reason: str, message: str = "No additional message provided", silent: bool = True):
         await interaction.response.send_message("Timing member out...", ephemeral=True)
@@ -203,36 +302,13 @@ class ModerationCog(commands.Cog):
             return
 
         try:
-            until = discord.utils.utcnow() + timeout_duration
-            await member.timeout(until, reason=reason)
-
-            # Create the embed
-            embed = discord.Embed(
-                title=f"{HOURGLASS_EMOJI} User Timed Out",
-                description=f"**User:** {member.mention}\n**Duration:** {duration}\n**Reason:** {reason}\n**Message:** {message}\n**Moderator:** {interaction.user.mention}",
-                color=discord.Color.orange()
+            embed, dispatch = await self.apply_timeout(
+                member, timeout_duration, duration, reason, message, interaction.user.mention,
+                public=interaction.followup.send if silent is False else None
             )
-            embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
-            embed.timestamp = discord.utils.utcnow()
-
-            # Try to DM the user
-            try:
-                await member.send(embed=embed)
-            except discord.Forbidden:
-                await interaction.followup.send(f"{WARNING_EMOJI} Couldn't DM {member.mention}. They might have DMs disabled.", ephemeral=True)
 
             # Respond in command channel
-            await interaction.followup.send(embed=embed, ephemeral=True)
-
-            if silent is False:
-                await interaction.followup.send(embed=embed)
-
-            # Send to log channel
-            log_channel = self.bot.get_channel(LOG_CHANNEL_ID)
-            if log_channel:
-                await log_channel.send(embed=embed)
-            else:
-                await interaction.followup.send(f"{WARNING_EMOJI} Log channel with ID {LOG_CHANNEL_ID} not found.", ephemeral=True)
+            await interaction.followup.send(dispatch.summary(), embed=embed, ephemeral=True)
 
         except discord.Forbidden:
             await interaction.followup.send(f"{X_EMOJI} I don't have permission to timeout this user.", ephemeral=True)
@@ -271,24 +347,15 @@ class ModerationCog(commands.Cog):
             embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
             embed.timestamp = discord.utils.utcnow()
 
-            # Try to DM the user
-            try:
-                await member.send(embed=embed)
-            except discord.Forbidden:
-                await interaction.followup.send(f"{WARNING_EMOJI} Couldn't DM {member.mention}. They might have DMs disabled.", ephemeral=True)
-
-            # Respond in command channel
-            await interaction.followup.send(embed=embed, ephemeral=True)
-
+            # They stay in the server, so the DM can go out alongside everything else
+            dispatch = ActionDispatch()
+            steps = {"DM": member.send(embed=embed), "Log": send_log(self.bot, embed=embed)}
             if silent is False:
-                await interaction.followup.send(embed=embed)
+                steps["Public"] = interaction.followup.send(embed=embed)
+            await dispatch.together(steps)
 
-            # Send to log channel
-            log_channel = self.bot.get_channel(LOG_CHANNEL_ID)
-            if log_channel:
-                await log_channel.send(embed=embed)
-            else:
-                await interaction.followup.send(f"{WARNING_EMOJI} Log channel with ID {LOG_CHANNEL_ID} not found.", ephemeral=True)
+            # Respond in command channel
+            await interaction.followup.send(dispatch.summary(), embed=embed, ephemeral=True)
 
         except discord.Forbidden:
             await interaction.followup.send(f"{X_EMOJI} I don't have permission to timeout this user.", ephemeral=True)
@@ -305,6 +372,7 @@ class ModerationCog(commands.Cog):
             await interaction.followup.send(f"{X_EMOJI} You don't have permission to use this command.", ephemeral=True)
             return
 
+        stage = AttachmentStage()
         try:
             # Prevent deletion of protected message IDs
             message_id_int = int(message_id)
@@ -312,21 +380,13 @@ class ModerationCog(commands.Cog):
                 await interaction.followup.send(f"{X_EMOJI} This message is restricted and cannot be deleted.", ephemeral=True)
                 return
 
-            # Search all text channels for the message
-            target_message = None
-            for channel in interaction.guild.text_channels:
-                try:
-                    msg = await channel.fetch_message(message_id_int)
-                    member = msg.author
-                    if msg:
-                        target_message = msg
-                        break
-                except (discord.NotFound, discord.Forbidden, discord.HTTPException):
-                    continue
+            # Look the message up where it was last seen, or search all text channels
+            target_message = await self.bot.message_index.find(interaction.guild, message_id_int)
 
             if not target_message:
                 await interaction.followup.send(f"{WARNING_EMOJI} Message not found in any accessible text channel.", ephemeral=True)
                 return
+            member = target_message.author
 
             # Check if message author has protected roles
             if isinstance(target_message.author, discord.Member):
@@ -351,21 +411,33 @@ class ModerationCog(commands.Cog):
 
             embed.timestamp = discord.utils.utcnow()
 
+            # Download attachments once, the evidence archive, log thread and DM all reuse the same bytes
+            errors = await stage.add_all(target_message.attachments)
+            if errors:
+                await interaction.followup.send(f"{X_EMOJI} Could not archive or resend some attachments due to an error: {errors[0]}", ephemeral=True)
+
+            # Keep a local copy under the message ID, pull it back with /mod evidence
+            if target_message.content:
+                await asyncio.to_thread(self.bot.evidence.store, target_message.id, "message.txt", "text/plain", target_message.content.encode())
+            if stage.staged:
+                await asyncio.to_thread(self.bot.evidence.store_staged, target_message.id, stage.staged)
+
             if should_resend:
-                resend_files = []
-                if target_message.attachments:
-                    for attachment in target_message.attachments:
-                        try:
-                            # Convert attachment to discord.File
-                            file = await attachment.to_file(use_cached=True)
-                            resend_files.append(file)
-                        except Exception as e:
-                            await interaction.followup.send(f"{X_EMOJI} Could not resend some attachments due to an error: {e}", ephemeral=True)
-
-            # Send to log channel
-            log_channel = self.bot.get_channel(LOG_CHANNEL_ID)
-            if log_channel:
-                log_message = await log_channel.send(embed=embed)
+                content_preview = target_message.content or "*[No text content]*"
+                if len(content_preview) > 1900:
+                    content_preview = content_preview[:1900] + "\n... *(truncated)*"
+
+                resend_embed = discord.Embed(
+                    title=f"{CLIPBOARD_EMOJI} Original Message Contents",
+                    description=content_preview,
+                    color=discord.Color.orange()
+                )
+                resend_embed.set_author(name=str(target_message.author), icon_url=target_message.author.display_avatar.url)
+                resend_embed.timestamp = discord.utils.utcnow()
+
+            async def log_deletion():
+                # The thread hangs off the log message, so it needs a message of its own
+                log_message = await send_log(self.bot, embed=embed, standalone=should_resend)
 
                 if should_resend:
                     thread_title = f"Deleted Message"
@@ -374,48 +446,145 @@ class ModerationCog(commands.Cog):
                         auto_archive_duration=60
                     )
 
-                    content_preview = target_message.content or "*[No text content]*"
-                    if len(content_preview) > 1900:
-                        content_preview = content_preview[:1900] + "\n... *(truncated)*"
-
-                    resend_embed = discord.Embed(
-                        title=f"{CLIPBOARD_EMOJI} Original Message Contents",
-                        description=content_preview,
-                        color=discord.Color.orange()
-                    )
-                    resend_embed.set_author(name=str(target_message.author), icon_url=target_message.author.display_avatar.url)
-                    resend_embed.timestamp = discord.utils.utcnow()
-
                     await thread.send(embed=resend_embed)
 
                     # Resend attachments if any
-                    if resend_files:
-                        await thread.send(files=resend_files)
-            else:
-                await interaction.followup.send(f"{WARNING_EMOJI} Log channel with ID {LOG_CHANNEL_ID} not found.", ephemeral=True)
+                    if stage.staged:
+                        await thread.send(files=stage.files())
 
-            # Try to DM the user
-            try:
+            async def dm_author():
                 await member.send(embed=embed)
                 if should_resend:
                     await member.send(embed=resend_embed)
-                    if resend_files:
-                        dm_files = []
-                        for attachment in target_message.attachments:
-                            file = await attachment.to_file(use_cached=True)
-                            dm_files.append(file)
-                        await member.send(files=dm_files)
-            except discord.Forbidden:
-                await interaction.followup.send(f"{WARNING_EMOJI} Couldn't DM {member.mention}. They might have DMs disabled.", ephemeral=True)
-
-            await target_message.delete()
+                    if stage.staged:
+                        await member.send(files=stage.files())
+
+            # Attachments are already staged, so the delete doesn't have to wait for the copies to go out
+            dispatch = ActionDispatch()
+            await dispatch.together({
+                "Log": log_deletion(),
+                "DM": dm_author(),
+                "Delete": target_message.delete()
+            })
+            if "Delete" not in dispatch.failed():
+                self.bot.message_index.forget(target_message.id)
             
             if silent is False:
                 await interaction.followup.send(embed=embed)
+                await interaction.followup.send(dispatch.summary(), ephemeral=True)
             else:
-                await interaction.followup.send(embed=embed, ephemeral=True)
+                await interaction.followup.send(dispatch.summary(), embed=embed, ephemeral=True)
         except Exception as e:
             await interaction.followup.send(f"{X_EMOJI} An unexpected error occurred: {str(e)}", ephemeral=True)
+        finally:
+            await stage.close()
+
+    @mod.command(name="purge", description="Delete a user's recent messages from every channel.")
+    async def purge(self, interaction: discord.Interaction, user: discord.User, minutes: app_commands.Range[int, 1, MAX_PURGE_MINUTES], reason: str, archive: bool = True):
+        await interaction.response.send_message("Collecting messages...", ephemeral=True)
+        author_roles = [role.id for role in interaction.user.roles]
+
+        # Check permission role
+        if MOD_ROLE_ID not in author_roles:
+            await interaction.followup.send(f"{X_EMOJI} You don't have permission to use this command.", ephemeral=True)
+            return
+
+        # Check if the user has protected roles
+        if isinstance(user, discord.Member) and any(role.id in PROTECTED_ROLE_IDS for role in user.roles):
+            await interaction.followup.send(f"{X_EMOJI} Cannot delete messages from protected users.", ephemeral=True)
+            return
+
+        stage = AttachmentStage()
+        try:
+            after = discord.utils.utcnow() - timedelta(minutes=minutes)
+            channels = readable_channels(interaction.guild)
+            found, errors = await for_each_channel(channels, lambda channel: collect_messages(channel, user.id, after))
+            found = {channel: messages for channel, messages in found.items() if messages}
+            messages = [message for channel_messages in found.values() for message in channel_messages]
+
+            if not messages:
+                await interaction.edit_original_response(content=f"{WARNING_EMOJI} No messages from {user.mention} in the last {minutes} minute(s).")
+                return
+
+            # Copy everything before it's gone
+            await interaction.edit_original_response(content=f"{HOURGLASS_EMOJI} Archiving {len(messages)} message(s)...")
+            attachment_errors = await stage.add_all([attachment for message in messages for attachment in message.attachments])
+            record = transcript(messages)
+            if archive:
+                await asyncio.to_thread(self.bot.evidence.store, interaction.id, "transcript.txt", "text/plain", record.encode())
+                if stage.staged:
+                    await asyncio.to_thread(self.bot.evidence.store_staged, interaction.id, stage.staged)
+
+            await interaction.edit_original_response(content=f"{HOURGLASS_EMOJI} Deleting {len(messages)} message(s) from {len(found)} channel(s)...")
+            deleted, delete_errors = await for_each_channel(list(found), lambda channel: delete_in_chunks(channel, found[channel]))
+            for channel, skipped in deleted.items():
+                skipped_ids = {message.id for message in skipped}
+                for message in found[channel]:
+                    if message.id not in skipped_ids:
+                        self.bot.message_index.forget(message.id)
+            skipped_count = sum(len(skipped) for skipped in deleted.values())
+            deleted_count = sum(len(found[channel]) for channel in deleted) - skipped_count
+
+            embed = discord.Embed(
+                title=f"{TRASH_EMOJI} Messages Purged",
+                description=f"**User:** {user.mention}\n**Window:** last {minutes} minute(s)\n**Deleted:** {deleted_count} message(s) from {len(deleted)} channel(s)\n**Reason:** {reason}\n**Moderator:** {interaction.user.mention}",
+                color=discord.Color.red()
+            )
+            if archive:
+                embed.set_footer(text=f"Case {interaction.id}")
+            embed.timestamp = discord.utils.utcnow()
+
+            async def log_purge():
+                # Everything goes in one thread: the transcript, then the attachments 10 to a message
+                log_message = await send_log(self.bot, embed=embed, standalone=True)
+                thread = await log_message.create_thread(name="Purged Messages", auto_archive_duration=60)
+                await thread.send(file=discord.File(io.BytesIO(record.encode()), filename="transcript.txt"))
+                files = stage.files()
+                for i in range(0, len(files), 10):
+                    await thread.send(files=files[i:i + 10])
+
+            dispatch = ActionDispatch()
+            await dispatch.together({"Log": log_purge()})
+
+            summary = dispatch.summary()
+            failures = len(errors) + len(delete_errors)
+            if failures:
+                summary += f"\n{WARNING_EMOJI} {failures} channel(s) could not be read or cleaned"
+            if skipped_count:
+                summary += f"\n{WARNING_EMOJI} {skipped_count} message(s) were too close to 14 days old to bulk delete"
+            if attachment_errors:
+                summary += f"\n{WARNING_EMOJI} {len(attachment_errors)} attachment(s) could not be archived"
+            await interaction.edit_original_response(content=summary, embed=embed)
+        except Exception as e:
+            await interaction.edit_original_response(content=f"{X_EMOJI} An unexpected error occurred: {str(e)}")
+        finally:
+            await stage.close()
+
+    @mod.command(name="evidence", description="Get the archived evidence for a deleted message or report.")
+    async def evidence(self, interaction: discord.Interaction, case_id: str):
+        await interaction.response.send_message("Fetching evidence...", ephemeral=True)
+        author_roles = [role.id for role in interaction.user.roles]
+
+        # Permission check
+        if MOD_ROLE_ID not in author_roles:
+            await interaction.followup.send(f"{X_EMOJI} You don't have permission to use this command.", ephemeral=True)
+            return
+
+        try:
+            case_id_int = int(case_id)
+        except ValueError:
+            await interaction.followup.send(f"{X_EMOJI} Invalid case ID format.", ephemeral=True)
+            return
+
+        entries = await asyncio.to_thread(self.bot.evidence.lookup, case_id_int)
+        files = [discord.File(path, filename=filename) for filename, content_type, path in entries if os.path.exists(path)]
+        if not files:
+            await interaction.followup.send(f"{WARNING_EMOJI} No archived evidence for case `{case_id}`.", ephemeral=True)
+            return
+
+        # Discord allows 10 files per message
+        for i in range(0, len(files), 10):
+            await interaction.followup.send(f"{CLIPBOARD_EMOJI} Evidence for case `{case_id}`" if i == 0 else None, files=files[i:i + 10], ephemeral=True)
 
     @mod.command(name="strike", description="Give a member a strike.")
     async def strike(self, interaction: discord.Interaction, member: discord.Member, reason: str, message: str = "No additional message provided", silent: bool = True):
@@ -437,28 +606,10 @@ class ModerationCog(commands.Cog):
             pass
 
         try:
-            data = self.load_strikes()
-            guild_id = str(interaction.guild.id)
-            user_id = str(member.id)
             now = datetime.now(timezone.utc)
 
-            # Ensure structure exists to avoid KeyError
-            data.setdefault(guild_id, {}).setdefault(user_id, [])
-
-            # Clean expired strikes
-            if self.clean_expired_strikes(data):
-                self.save_strikes(data)
-
-            # Make sure keys still exist after cleanup
-            data.setdefault(guild_id, {}).setdefault(user_id, [])
-
-            # Add new strike
-            data[guild_id][user_id].append({
-                "timestamp": now.isoformat()
-            })
-
-
-            self.save_strikes(data)
+            # Add new strike, expired ones don't count towards the total
+            active_strikes = await self.bot.strikes.add_strike(interaction.guild.id, member.id, now)
 
             # Prepare embed
             embed = discord.Embed(
@@ -474,28 +625,18 @@ class ModerationCog(commands.Cog):
             embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
             embed.timestamp = now
 
-            # DM the user
-            try:
-                await member.send(embed=embed)
-            except discord.Forbidden:
-                await interaction.followup.send(f"{WARNING_EMOJI} Couldn't DM {member.mention}. They might have DMs disabled.", ephemeral=True)
-
-            # Always respond to the staff member
-            await interaction.followup.send(embed=embed, ephemeral=True)
-
-            # Optionally show public embed
+            # DM, public embed and mod-log don't depend on each other, send them all at once
+            dispatch = ActionDispatch()
+            steps = {"DM": member.send(embed=embed), "Log": send_log(self.bot, embed=embed)}
             if not silent:
-                await interaction.channel.send(embed=embed)
+                steps["Public"] = interaction.channel.send(embed=embed)
+            await dispatch.together(steps)
 
-            # Log to mod-log
-            log_channel = self.bot.get_channel(LOG_CHANNEL_ID)
-            if log_channel:
-                await log_channel.send(embed=embed)
-            else:
-                await interaction.followup.send(f"{WARNING_EMOJI} Log channel with ID {LOG_CHANNEL_ID} not found.", ephemeral=True)
+            # Always respond to the staff member
+            await interaction.followup.send(dispatch.summary(), embed=embed, ephemeral=True)
 
             # Check for 4 strikes (ban)
-            if len(data[guild_id][user_id]) >= 4:
+            if active_strikes >= 4:
                 ban_embed = discord.Embed(
                     title=f"{LOCK_EMOJI} User Banned",
                     description=(
@@ -508,18 +649,17 @@ class ModerationCog(commands.Cog):
                 ban_embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
                 ban_embed.timestamp = now
 
-                try:
-                    await member.send(embed=ban_embed)
-                except discord.Forbidden:
-                    await interaction.followup.send(f"{WARNING_EMOJI} Couldn't DM {member.mention}. They might have DMs disabled.", ephemeral=True)
+                # DM before the ban, they can't be messaged afterwards
+                ban_dispatch = ActionDispatch()
+                await ban_dispatch.first("DM", member.send(embed=ban_embed))
 
                 try:
                     await member.ban(reason="Reached 4 active strikes.", delete_message_seconds=0)
-                    await interaction.followup.send(embed=ban_embed, ephemeral=True)
+                    steps = {"Log": send_log(self.bot, embed=ban_embed)}
                     if not silent:
-                        await interaction.channel.send(embed=ban_embed)
-                    if log_channel:
-                        await log_channel.send(embed=ban_embed)
+                        steps["Public"] = interaction.channel.send(embed=ban_embed)
+                    await ban_dispatch.together(steps)
+                    await interaction.followup.send(ban_dispatch.summary(), embed=ban_embed, ephemeral=True)
                 except discord.Forbidden:
                     await interaction.followup.send(f"{X_EMOJI} I don't have permission to ban this user.", ephemeral=True)
                 except Exception as e:
@@ -527,15 +667,15 @@ class ModerationCog(commands.Cog):
                 return
 
             # If 2 or more strikes, revoke goober roles
-            elif len(data[guild_id][user_id]) >= 2:
+            elif active_strikes >= 2:
                 goober_role = interaction.guild.get_role(GOOBER_ROLE_ID)
                 goober_2_role = interaction.guild.get_role(GOOBER_2_ROLE_ID)
 
                 try:
-                    if goober_role in member.roles:
-                        await member.remove_roles(goober_role, reason="Reached 2+ active strikes.")
-                    if goober_2_role in member.roles:
-                        await member.remove_roles(goober_2_role, reason="Reached 2+ active strikes.")
+                    # One request for both roles
+                    revoked = [role for role in (goober_role, goober_2_role) if role in member.roles]
+                    if revoked:
+                        await member.remove_roles(*revoked, reason="Reached 2+ active strikes.")
                 except Exception as e:
                     await interaction.followup.send(f"{WARNING_EMOJI} Could not remove Goober roles: {e}", ephemeral=True)
 
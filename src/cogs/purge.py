@@ -0,0 +1,59 @@
+import asyncio
+import discord
+from datetime import datetime, timedelta
+
+# Every channel has its own rate-limit buckets for history and bulk delete; the cap
+# keeps a big guild from tripping the global limit
+PURGE_CONCURRENCY = 4
+BULK_DELETE_CHUNK = 100     # Most messages delete_messages takes per request
+# Bulk delete refuses a whole chunk if any message in it is older than 14 days. Messages
+# that get within a few minutes of that are left alone, and the purge window stops an hour
+# short so collecting and archiving a full window doesn't push its oldest messages over
+BULK_DELETE_MAX_AGE = timedelta(days=14) - timedelta(minutes=5)
+MAX_PURGE_MINUTES = 14 * 24 * 60 - 60
+
+async def collect_messages(channel, user_id: int, after: datetime) -> list:
+    """One channel's messages from `user_id` sent after `after`, oldest first."""
+    # A channel that's been quiet since before the window has nothing to read
+    if channel.last_message_id is not None and channel.last_message_id < discord.utils.time_snowflake(after):
+        return []
+    return [message async for message in channel.history(limit=None, after=after) if message.author.id == user_id]
+
+async def delete_in_chunks(channel, messages: list) -> list:
+    """Bulk deletes messages 100 at a time, returns the ones skipped for being too old to bulk delete."""
+    cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+    skipped = [message for message in messages if message.created_at <= cutoff]
+    messages = [message for message in messages if message.created_at > cutoff]
+    for start in range(0, len(messages), BULK_DELETE_CHUNK):
+        await channel.delete_messages(messages[start:start + BULK_DELETE_CHUNK])
+    return skipped
+
+async def for_each_channel(channels, work, concurrency: int = PURGE_CONCURRENCY) -> tuple:
+    """Runs `work(channel)` for every channel, a few at a time.
+
+    Returns ({channel: result}, {channel: error}); one channel failing doesn't stop the rest.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(channel):
+        async with semaphore:
+            return await work(channel)
+
+    outcomes = await asyncio.gather(*(run(channel) for channel in channels), return_exceptions=True)
+    results, errors = {}, {}
+    for channel, outcome in zip(channels, outcomes):
+        if isinstance(outcome, Exception):
+            errors[channel] = outcome
+        else:
+            results[channel] = outcome
+    return results, errors
+
+def transcript(messages: list) -> str:
+    """Plain text record of purged messages in the order they were sent."""
+    lines = []
+    for message in sorted(messages, key=lambda message: message.id):
+        line = f"[{message.created_at:%Y-%m-%d %H:%M:%S}] #{message.channel.name} {message.author}: {message.content}"
+        for attachment in message.attachments:
+            line += f"\n    [attachment] {attachment.filename}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,98 @@
+from collections import deque
+from datetime import datetime, timedelta
+
+RAID_SCORE = 20         # Join score inside the window that starts a lockdown
+RAID_WINDOW = 60.0      # Seconds of joins the score covers
+LOCKDOWN_QUIET = 600.0  # A lockdown lifts once joins have been back to normal this long
+
+def join_weight(account_created: datetime, has_avatar: bool, now: datetime) -> int:
+    """How much one join counts towards a raid. Fresh, faceless accounts count most."""
+    age = now - account_created
+    weight = 1
+    if age < timedelta(days=7):
+        weight += 1
+    if age < timedelta(days=1):
+        weight += 1
+    if not has_avatar:
+        weight += 1
+    return weight
+
+class GuildJoins:
+    __slots__ = ("recent", "score", "locked_until", "pending")
+
+    def __init__(self) -> None:
+        self.recent = deque()   # (time, weight, member_id), oldest first
+        self.score = 0
+        self.locked_until = None
+        self.pending = []
+
+class RaidDetector:
+    """Watches how fast members join each guild and decides when to lock down.
+
+    Joins are kept per guild in a deque covering the last `window` seconds with
+    a running total of their weights (see join_weight), so each join is O(1)
+    amortized. When the total reaches `threshold` the guild goes into lockdown:
+    the joins that tripped it, and every join after, are queued in `pending`
+    for the caller to time out in batches. The lockdown lifts once
+    `quiet_period` seconds pass with the score below half the threshold, or
+    when ended by hand.
+    """
+
+    def __init__(self, threshold: int = RAID_SCORE, window: float = RAID_WINDOW, quiet_period: float = LOCKDOWN_QUIET) -> None:
+        self.threshold = threshold
+        self.window = window
+        self.quiet_period = quiet_period
+        self.guilds = {}
+
+    def record_join(self, guild_id: int, member_id: int, weight: int, now: float) -> bool:
+        """Records a join, returns True if it started a lockdown."""
+        joins = self.guilds.setdefault(guild_id, GuildJoins())
+
+        while joins.recent and now - joins.recent[0][0] > self.window:
+            joins.score -= joins.recent.popleft()[1]
+        joins.recent.append((now, weight, member_id))
+        joins.score += weight
+
+        if self.in_lockdown(guild_id, now):
+            joins.pending.append(member_id)
+            # Only a still-busy window keeps it going, normal joins shouldn't hold it open forever
+            if joins.score >= self.threshold / 2 and joins.locked_until != float("inf"):
+                joins.locked_until = max(joins.locked_until, now + self.quiet_period)
+            return False
+
+        if joins.score < self.threshold:
+            return False
+        joins.pending.extend(member_id for _, _, member_id in joins.recent)
+        self.start_lockdown(guild_id, now + self.quiet_period)
+        return True
+
+    def in_lockdown(self, guild_id: int, now: float) -> bool:
+        joins = self.guilds.get(guild_id)
+        return bool(joins and joins.locked_until is not None and now < joins.locked_until)
+
+    def lockdown_expired(self, guild_id: int, now: float) -> bool:
+        """True once for a lockdown that has run out, so the caller can announce it."""
+        joins = self.guilds.get(guild_id)
+        if not joins or joins.locked_until is None or now < joins.locked_until:
+            return False
+        joins.locked_until = None
+        return True
+
+    def start_lockdown(self, guild_id: int, until: float = float("inf")) -> None:
+        """Locks a guild down until `until` (monotonic seconds); by default until end_lockdown."""
+        joins = self.guilds.setdefault(guild_id, GuildJoins())
+        joins.locked_until = until
+        joins.recent.clear()
+        joins.score = 0
+
+    def end_lockdown(self, guild_id: int) -> None:
+        joins = self.guilds.get(guild_id)
+        if joins:
+            joins.locked_until = None
+
+    def take_pending(self, guild_id: int) -> list:
+        joins = self.guilds.get(guild_id)
+        if not joins or not joins.pending:
+            return []
+        pending, joins.pending = joins.pending, []
+        return pending
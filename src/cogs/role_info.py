@@ -0,0 +1,101 @@
+import discord
+import hashlib
+import io
+import json
+import os
+from cogs.ids import *
+
+EMBED_COLOR = 16772213
+DIVIDER = "----------------------------\n"
+
+# (heading, [(emoji, mention, description), ...], closing fields) per embed, in display order
+ROLE_SECTIONS = [
+    (f"{STAR_EMOJI} Exclusive Roles {STAR_EMOJI}", [
+        (ACRYLIC_ROLE_EMOJI, ACRYLIC_ROLE_MENTION, "A role exclusive to the channel owner himself, Acrylic"),
+        (SALAMI_ROLE_EMOJI, SALAMI_ROLE_MENTION, "A role exclusive to Salami, the artist for the videos"),
+        (CREATORS_ROLE_EMOJI, CREATORS_ROLE_MENTION, "A role exclusive to the creators of the channel, its real purpose is just to group Acrylic and Salami together on the member list"),
+    ], []),
+    (f"{STAFF_EMOJI} Staff Roles {STAFF_EMOJI}", [
+        (ART_PANEL_ROLE_EMOJI, ART_PANEL_ROLE_MENTION, "Behind the scenes access to upcoming videos, providing feedback and suggested changes to make before the video is released publicly"),
+        (MOD_ROLE_EMOJI, MOD_ROLE_MENTION, "Access to <@1396161419434655855> commands. Moderates server to ensure a safe environment for everybody"),
+    ], []),
+    (f"{COMMUNITY_EMOJI} Community Roles {COMMUNITY_EMOJI}", [
+        (SPECIAL_ROLE_EMOJI, SPECIAL_ROLE_MENTION, "Granted to users under special circumstances, say winning an event"),
+        (SUPER_SUPPORTER_ROLE_EMOJI, SUPER_SUPPORTER_ROLE_MENTION, "Automatically granted to those who are a Tier 2, YouTube channel member and a Tier 3, Twitch sub. No additional perks, you just stand out more"),
+        (MEMBER_TIER_2_ROLE_EMOJI, MEMBER_TIER_2_ROLE_MENTION, "Automatically granted to those who are a Tier 2, YouTube channel member. See YouTube channel for perks"),
+        (MEMBER_TIER_1_ROLE_EMOJI, MEMBER_TIER_1_ROLE_MENTION, "Automatically granted to those who are a Tier 1, YouTube channel member. See YouTube channel for perks"),
+        (MEMBER_ROLE_EMOJI, MEMBER_ROLE_MENTION, "Automatically granted to anyone who is a YouTube channel member, regardless of tier. Comes with perms to change your nickname"),
+        (SUB_TIER_3_ROLE_EMOJI, SUB_TIER_3_ROLE_MENTION, "Automatically granted to those who are a Tier 3, Twitch sub"),
+        (SUB_TIER_2_ROLE_EMOJI, SUB_TIER_2_ROLE_MENTION, "Automatically granted to those who are a Tier 2, Twitch sub"),
+        (SUB_TIER_1_ROLE_EMOJI, SUB_TIER_1_ROLE_MENTION, "Automatically granted to those who are a Tier 1, Twitch sub"),
+        (SUB_ROLE_EMOJI, SUB_ROLE_MENTION, "Automatically granted to anyone who is a Twitch sub, regardless of tier. Comes with perms to change your nickname"),
+        (BOOSTER_ROLE_EMOJI, BOOSTER_ROLE_MENTION, "Automatically granted to those who boost the server. Comes with perms to change your nickname"),
+        (ARTIST_ROLE_EMOJI, ARTIST_ROLE_MENTION, "Apply for this role using `/tools artist` and send your own art. Don't worry, your art isn't being judged on skill, the application process is just to prevent low effort, stolen, and or A.I. art"),
+        (GOOBER_2_ROLE_EMOJI, GOOBER_2_ROLE_MENTION, "Run `/tools goober2` at least 3 weeks after joining and you will be granted this role. Comes with perms to create polls, change your nickname, and start activities in voice chats"),
+        (GOOBER_ROLE_EMOJI, GOOBER_ROLE_MENTION, "Run `/tools goober` at least 3 days after joining and you will be granted this role. Comes with extended reaction perms, along with image and embed perms"),
+    ], []),
+    (f"{PUSHPIN_EMOJI} Notification Roles {PUSHPIN_EMOJI}", [
+        (None, POLL_PINGS_ROLE_MENTION, "Sometimes we host polls for everybody to participate in, not just channel members"),
+        (None, EVENT_PINGS_ROLE_MENTION, "You'll be pinged for events. What kind of events? idk maybe like a game sesh or something"),
+        (None, MERCH_PINGS_ROLE_MENTION, "You'll be pinged whenever new merch is announced and or dropped"),
+        (None, GIVEAWAY_PINGS_ROLE_MENTION, "You'll be pinged whenever a giveaway is hosted"),
+        (None, STREAM_PINGS_ROLE_MENTION, "Get notified when Acrylic goes live"),
+        (None, SECOND_CHANNEL_PINGS_ROLE_MENTION, "Get notified whenever a video is posted on the second channel"),
+        (None, VOD_CHANNEL_PINGS_ROLE_MENTION, "You'll be notified whenever a video is uploaded to the VOD channel"),
+    ], ["", "To obtain these roles, go to the \"Channels & Roles\" tab"]),
+]
+
+def build_embeds(sections=ROLE_SECTIONS) -> list:
+    embeds = []
+    for heading, roles, closing in sections:
+        embed = discord.Embed(color=EMBED_COLOR)
+        embed.add_field(inline=False, name=heading, value=DIVIDER)
+        for emoji, mention, description in roles:
+            title = f"{emoji}{mention}{emoji}" if emoji else mention
+            embed.add_field(inline=True, name="", value=f"{title}\n{description}")
+        for name in closing:
+            embed.add_field(inline=False, name=name, value="")
+        embeds.append(embed)
+    return embeds
+
+def embeds_hash(embeds) -> str:
+    payload = json.dumps([embed.to_dict() for embed in embeds], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class RoleInfo:
+    """The #role-info embeds, built once from ROLE_SECTIONS.
+
+    Remembers the hash of what was last published to each message (in
+    `state_path`, so it survives restarts) so an update with nothing new is
+    skipped instead of sent as an identical edit. The banner image is read from
+    disk the first time it's needed and kept in memory after that.
+    """
+
+    def __init__(self, image_path: str = "./img/Roles.png", state_path: str = "role_info.json") -> None:
+        self.image_path = os.path.abspath(image_path)
+        self.state_path = os.path.abspath(state_path)
+        self.embeds = build_embeds()
+        self.digest = embeds_hash(self.embeds)
+        self.image = None
+        self.published = {}
+        try:
+            with open(self.state_path) as f:
+                self.published = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+    def image_file(self) -> discord.File:
+        if self.image is None:
+            with open(self.image_path, "rb") as f:
+                self.image = f.read()
+        return discord.File(io.BytesIO(self.image), filename="Roles.png")
+
+    def is_current(self, message_id: int) -> bool:
+        return self.published.get(str(message_id)) == self.digest
+
+    def mark_published(self, message_id: int) -> None:
+        self.published[str(message_id)] = self.digest
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.published, f)
+        os.replace(tmp_path, self.state_path)
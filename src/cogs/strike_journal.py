@@ -0,0 +1,173 @@
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+from cogs.strike_store import to_epoch
+from cogs.strike_table import StrikeTable
+
+def open_snapshot(f) -> tuple:
+    """Reads a snapshot's header, returns (seq, rows) with rows yielding (guild_id, user_id, timestamps).
+
+    A snapshot is a {"seq": n} line followed by one line per member, so it can
+    be read a member at a time. Snapshots written before that were a single
+    JSON document; those are still read, all at once.
+    """
+    header = json.loads(f.readline())
+    if "strikes" in header:
+        return header["seq"], StrikeTable.from_json(header["strikes"]).items()
+
+    def rows():
+        for line in f:
+            record = json.loads(line)
+            yield record["guild_id"], record["user_id"], record["timestamps"]
+    return header["seq"], rows()
+
+def stream_strikes(snapshot_path: str = "strikes.snapshot.json", journal_path: str = "strikes.journal"):
+    """Yields every strike of a journal store as (guild_id, user_id, epoch seconds), without loading the store.
+
+    Only one member's snapshot line is held at a time, then the journal records
+    the snapshot doesn't contain yet follow. A compaction while this runs can
+    skip strikes, so stop the bot first.
+    """
+    with open(os.path.abspath(snapshot_path), "r", encoding="utf-8") as f:
+        seq, rows = open_snapshot(f)
+        for guild_id, user_id, timestamps in rows:
+            for timestamp in timestamps:
+                yield guild_id, user_id, timestamp
+
+    try:
+        with open(os.path.abspath(journal_path), "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if record["seq"] > seq:
+                    yield record["guild_id"], record["user_id"], record["timestamp"]
+    except FileNotFoundError:
+        return
+
+class JournalStrikeStore:
+    """Strike store that appends every new strike to a write-ahead journal.
+
+    Adding a strike writes and fsyncs one line instead of rewriting the whole
+    document. The store keeps no strikes in memory: `iter_strikes` reads them
+    back from disk, and `compact` writes the strikes it's given (the service's
+    table) as a new snapshot that remembers the last journal sequence number it
+    contains, then starts the journal over. The snapshot is swapped in
+    atomically, so a crash at any point recovers to the same state.
+    """
+
+    # compact() is handed the service's strikes to write out
+    compacts_from_memory = True
+
+    def __init__(self, snapshot_path: str = "strikes.snapshot.json", journal_path: str = "strikes.journal", legacy_path: str = "strikes.json") -> None:
+        self.snapshot_path = os.path.abspath(snapshot_path)
+        self.journal_path = os.path.abspath(journal_path)
+        self.seq = 0
+        self.journal_records = 0
+
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                self.seq, _ = open_snapshot(f)
+        else:
+            # First start in journal mode, carry the old strikes.json over
+            self.write_snapshot(StrikeTable.from_json(self.read_legacy(legacy_path)))
+
+        self.check_journal()
+        self.journal = open(self.journal_path, "a", encoding="utf-8")
+
+    def read_legacy(self, legacy_path: str) -> dict:
+        try:
+            with open(os.path.abspath(legacy_path), "r") as f:
+                raw = f.read().strip()
+            return json.loads(raw) if raw else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def check_journal(self) -> None:
+        """Picks up the sequence number from journal records newer than the snapshot, dropping a torn tail."""
+        if not os.path.exists(self.journal_path):
+            return
+
+        good_offset = 0
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Half-written record from a crash, everything before it is intact
+                    break
+                good_offset += len(line)
+                self.journal_records += 1
+                self.seq = max(self.seq, record["seq"])
+
+        if good_offset != os.path.getsize(self.journal_path):
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(good_offset)
+                os.fsync(f.fileno())
+
+    def write_snapshot(self, table: StrikeTable) -> None:
+        # Write next to the real file and rename over it so readers never see half a snapshot
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"seq": self.seq}) + "\n")
+            for guild_id, user_id, timestamps in table.items():
+                f.write(json.dumps({"guild_id": guild_id, "user_id": user_id, "timestamps": list(timestamps)}, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    def reset_journal(self) -> None:
+        # The snapshot already holds every record, so the journal can start over
+        self.journal.truncate(0)
+        self.journal.seek(0)
+        os.fsync(self.journal.fileno())
+        self.journal_records = 0
+
+    def iter_strikes(self):
+        """Yields every stored strike as (guild_id, user_id, epoch seconds), read from the snapshot and journal."""
+        yield from stream_strikes(self.snapshot_path, self.journal_path)
+
+    def add_strike(self, guild_id: int, user_id: int, when: Optional[datetime] = None) -> None:
+        self.add_strikes([(guild_id, user_id, to_epoch(when))])
+
+    def add_strikes(self, rows) -> int:
+        """Appends (guild_id, user_id, epoch seconds) rows with a single fsync."""
+        records = []
+        for guild_id, user_id, timestamp in rows:
+            self.seq += 1
+            records.append({"seq": self.seq, "guild_id": guild_id, "user_id": user_id, "timestamp": timestamp})
+
+        self.journal.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records))
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+        self.journal_records += len(records)
+        return len(records)
+
+    def replace_strikes(self, rows) -> int:
+        """Replaces every stored strike with (guild_id, user_id, epoch seconds) rows.
+
+        The new strikes go straight into a snapshot that covers every journal
+        record so far, then the journal starts over.
+        """
+        table = StrikeTable()
+        for guild_id, user_id, timestamp in rows:
+            table.add(guild_id, user_id, timestamp)
+        self.write_snapshot(table)
+        self.reset_journal()
+        return len(table)
+
+    def clean_expired(self, now: Optional[datetime] = None, members=None) -> int:
+        """Nothing to do here: expired strikes are left out of the next snapshot `compact` writes."""
+        return 0
+
+    def compact(self, strikes: StrikeTable) -> bool:
+        """Writes `strikes`, which must hold every journaled strike, as the snapshot and empties the journal."""
+        self.write_snapshot(strikes)
+        self.reset_journal()
+        return True
+
+    def close(self) -> None:
+        self.journal.close()
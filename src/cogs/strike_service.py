@@ -0,0 +1,269 @@
+import asyncio
+import heapq
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+from cogs.strike_store import STRIKE_EXPIRY, StrikeStore, to_epoch
+from cogs.strike_journal import JournalStrikeStore, stream_strikes as stream_journal_strikes
+from cogs.strike_table import StrikeTable
+
+EXPIRY_SECONDS = int(STRIKE_EXPIRY.total_seconds())
+BACKEND_MARKER = "strikes.backend"      # Names the backend that last ran
+
+# Backend name -> (file that exists once it has run, store class)
+BACKENDS = {
+    "sqlite": ("strikes.db", StrikeStore),
+    "journal": ("strikes.snapshot.json", JournalStrikeStore)
+}
+
+def configured_backend(backend: Optional[str] = None) -> str:
+    return "journal" if (backend or os.getenv("strike_backend")) == "journal" else "sqlite"
+
+def last_backend() -> Optional[str]:
+    try:
+        with open(os.path.abspath(BACKEND_MARKER), "r") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def open_strike_store(backend: Optional[str] = None):
+    """Opens the configured strike backend, strike_backend=journal or SQLite by default.
+
+    A backend only imports strikes.json on its very first start, so when
+    strike_backend changes, every strike is copied over from the backend that
+    ran last (kept in strikes.backend), replacing whatever the new one still
+    held from an earlier stint.
+    """
+    backend = configured_backend(backend)
+    previous = last_backend()
+    if previous is None:
+        # Installs from before the marker: whichever store already exists was the one in use
+        others = [name for name, (path, _) in BACKENDS.items() if name != backend and os.path.exists(path)]
+        if others and not os.path.exists(BACKENDS[backend][0]):
+            previous = others[0]
+
+    store = BACKENDS[backend][1]()
+    if previous in BACKENDS and previous != backend:
+        old_store = BACKENDS[previous][1]()
+        try:
+            count = store.replace_strikes(old_store.iter_strikes())
+        finally:
+            old_store.close()
+        print(f"Carried {count} strike(s) over from the {previous} strike backend to {backend}")
+
+    if previous != backend:
+        # Only after the copy succeeded, so a crash part way retries it
+        with open(os.path.abspath(BACKEND_MARKER), "w") as f:
+            f.write(backend)
+    return store
+
+def stream_strikes(backend: Optional[str] = None):
+    """Yields every stored strike as (guild_id, user_id, epoch seconds) without loading the whole store.
+
+    SQLite streams off its cursor and the journal backend reads its snapshot a
+    member at a time. A store that still has to be carried over from another
+    backend is opened normally first.
+    """
+    backend = configured_backend(backend)
+    if backend == "journal" and last_backend() == "journal":
+        yield from stream_journal_strikes()
+        return
+    store = open_strike_store(backend)
+    try:
+        yield from store.iter_strikes()
+    finally:
+        store.close()
+
+class StrikeService:
+    """Async front for a strike store.
+
+    Reads are answered from an in-memory copy of every strike. Writes go into
+    a queue drained by a single writer task, which runs the store's blocking
+    disk work on its own thread, so concurrent strikes are applied one at a
+    time and never stall the event loop.
+
+    Expiry is driven by a min-heap holding one entry per member, keyed by when
+    their oldest strike turns 30 days old. A background task sleeps until the
+    earliest entry is due, so cleaning only ever touches strikes that expired.
+
+    Active counts are cached per member until their oldest active strike
+    expires, so eligibility checks are a dictionary hit.
+
+    The in-memory table is the only full copy of the strikes. A store that
+    snapshots (the journal) is handed a copy of it to write out on `compact`,
+    which only happens when strikes were added or expired since the last one.
+    """
+
+    def __init__(self, store) -> None:
+        self.store = store
+        # One worker thread means the store is only ever touched by one writer
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="strike-writer")
+        self.queue = asyncio.Queue()
+        self.strikes = StrikeTable()
+        self.writer = None
+
+        self.expiry_heap = []
+        self.expiry_wakeup = asyncio.Event()
+        self.expiry_task = None
+        # Whether strikes were added or expired since the last compaction
+        self.changed = False
+
+        # (guild_id, user_id) -> (active count, epoch second the count stops being valid)
+        self.count_cache = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(self.executor, lambda: list(self.store.iter_strikes()))
+        for guild_id, user_id, timestamp in rows:
+            self.strikes.add(guild_id, user_id, timestamp)
+
+        self.expiry_heap = [(timestamps[0] + EXPIRY_SECONDS, guild_id, user_id) for guild_id, user_id, timestamps in self.strikes.items()]
+        heapq.heapify(self.expiry_heap)
+
+        self.writer = asyncio.create_task(self.run_writer())
+        self.expiry_task = asyncio.create_task(self.run_expiry())
+
+    async def run_writer(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            func, args, future = await self.queue.get()
+            try:
+                result = await loop.run_in_executor(self.executor, func, *args)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def run_expiry(self) -> None:
+        while True:
+            self.expiry_wakeup.clear()
+            delay = self.expiry_heap[0][0] - time.time() if self.expiry_heap else None
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self.expiry_wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            try:
+                await self.clean_expired()
+            except Exception as e:
+                print(f"Failed to clean expired strikes: {e}")
+                await asyncio.sleep(60)
+
+    def schedule_expiry(self, guild_id: int, user_id: int) -> None:
+        expires_at = self.strikes.get(guild_id, user_id)[0] + EXPIRY_SECONDS
+        if not self.expiry_heap or expires_at < self.expiry_heap[0][0]:
+            self.expiry_wakeup.set()
+        heapq.heappush(self.expiry_heap, (expires_at, guild_id, user_id))
+
+    async def submit(self, func, *args):
+        """Queues a store call for the writer and waits until it has hit disk."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((func, args, future))
+        return await future
+
+    def count_active(self, guild_id: int, user_id: int, now: Optional[datetime] = None) -> int:
+        key = (guild_id, user_id)
+        now_epoch = to_epoch(now)
+        cached = self.count_cache.get(key)
+        if cached and now_epoch < cached[1]:
+            self.cache_hits += 1
+            return cached[0]
+
+        if not self.strikes.get(guild_id, user_id):
+            # Members without strikes aren't cached, so the cache only grows with striked members
+            return 0
+
+        self.cache_misses += 1
+        return self.refresh_count(guild_id, user_id, now_epoch)
+
+    def refresh_count(self, guild_id: int, user_id: int, now_epoch: int) -> int:
+        """Counts a member's active strikes from their array and caches the result."""
+        timestamps = self.strikes.get(guild_id, user_id)
+        count = self.strikes.count_after(guild_id, user_id, now_epoch - EXPIRY_SECONDS)
+        # Stays right until the oldest active strike expires, or forever if none are left (new strikes update it)
+        valid_until = timestamps[-count] + EXPIRY_SECONDS if count else float("inf")
+        self.count_cache[(guild_id, user_id)] = (count, valid_until)
+        return count
+
+    def cache_stats(self) -> dict:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "entries": len(self.count_cache),
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / lookups if lookups else 0.0
+        }
+
+    async def add_strike(self, guild_id: int, user_id: int, when: Optional[datetime] = None) -> int:
+        # Memory is updated before yielding so a second strike racing this one counts it too
+        timestamp = to_epoch(when)
+        timestamps = self.strikes.add(guild_id, user_id, timestamp)
+        self.changed = True
+        if timestamps[0] == timestamp:
+            self.schedule_expiry(guild_id, user_id)
+
+        # The write already knows the new count, so it doesn't go through count_active and its hit/miss stats
+        cached = self.count_cache.get((guild_id, user_id))
+        if cached and timestamp < cached[1]:
+            count = cached[0] + 1
+            self.count_cache[(guild_id, user_id)] = (count, min(cached[1], timestamp + EXPIRY_SECONDS))
+        else:
+            count = self.refresh_count(guild_id, user_id, timestamp)
+        await self.submit(self.store.add_strike, guild_id, user_id, when)
+        return count
+
+    async def clean_expired(self, now: Optional[datetime] = None) -> int:
+        """Evicts strikes whose expiry has passed, returns how many were removed."""
+        now_epoch = to_epoch(now)
+        cutoff = now_epoch - EXPIRY_SECONDS
+        removed = 0
+        expired = []
+
+        while self.expiry_heap and self.expiry_heap[0][0] <= now_epoch:
+            expires_at, guild_id, user_id = heapq.heappop(self.expiry_heap)
+            timestamps = self.strikes.get(guild_id, user_id)
+            # Entries are never updated in place, skip ones that no longer match the oldest strike
+            if not timestamps or timestamps[0] + EXPIRY_SECONDS != expires_at:
+                continue
+
+            removed += self.strikes.remove_until(guild_id, user_id, cutoff)
+            expired.append((guild_id, user_id))
+            timestamps = self.strikes.get(guild_id, user_id)
+            if timestamps:
+                heapq.heappush(self.expiry_heap, (timestamps[0] + EXPIRY_SECONDS, guild_id, user_id))
+            self.count_cache.pop((guild_id, user_id), None)
+
+        if removed:
+            self.changed = True
+            await self.submit(self.store.clean_expired, now, expired)
+        return removed
+
+    async def compact(self) -> bool:
+        """Has the store fold its recent writes together, returns False if nothing changed since last time."""
+        if not self.changed:
+            return False
+        self.changed = False
+        # Copied before queueing: the copy then holds exactly the strikes whose writes are queued ahead of it
+        strikes = self.strikes.copy() if self.store.compacts_from_memory else None
+        try:
+            return await self.submit(self.store.compact, strikes)
+        except Exception:
+            self.changed = True
+            raise
+
+    async def close(self) -> None:
+        if self.expiry_task:
+            self.expiry_task.cancel()
+        await self.queue.join()
+        if self.writer:
+            self.writer.cancel()
+        await asyncio.get_running_loop().run_in_executor(self.executor, self.store.close)
+        self.executor.shutdown()
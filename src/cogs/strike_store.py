@@ -0,0 +1,119 @@
+import sqlite3
+import json
+import os
+from datetime import timedelta, datetime, timezone
+from typing import Optional
+
+STRIKE_EXPIRY = timedelta(days=30)
+
+def to_epoch(when: Optional[datetime] = None) -> int:
+    """Converts an aware datetime (default: now) into epoch seconds."""
+    if when is None:
+        when = datetime.now(timezone.utc)
+    return int(when.timestamp())
+
+class StrikeStore:
+    """One strike store shared by every cog, backed by SQLite.
+
+    Strikes live in a single table indexed on (guild_id, user_id, timestamp),
+    so counting a member's active strikes is one indexed range query no matter
+    how many strikes the server has handed out.
+    """
+
+    compacts_from_memory = False
+
+    def __init__(self, path: str = "strikes.db", legacy_path: str = "strikes.json") -> None:
+        self.path = os.path.abspath(path)
+        # The connection is opened here but used from the strike writer thread
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL appends each commit to a journal instead of rewriting pages in place
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS strikes ("
+            "guild_id INTEGER NOT NULL, "
+            "user_id INTEGER NOT NULL, "
+            "timestamp INTEGER NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS strikes_member ON strikes (guild_id, user_id, timestamp)")
+        # Lets clean_expired delete by age without scanning the whole table
+        self.db.execute("CREATE INDEX IF NOT EXISTS strikes_timestamp ON strikes (timestamp)")
+        self.db.commit()
+
+        # user_version 0 means the old strikes.json has never been imported
+        if self.db.execute("PRAGMA user_version").fetchone()[0] == 0:
+            self.import_legacy(legacy_path)
+            self.db.execute("PRAGMA user_version = 1")
+            self.db.commit()
+
+    def import_legacy(self, legacy_path: str) -> int:
+        """Copies strikes from the old strikes.json layout into the database."""
+        try:
+            with open(os.path.abspath(legacy_path), "r") as f:
+                raw = f.read().strip()
+            data = json.loads(raw) if raw else {}
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+
+        rows = [
+            (int(guild_id), int(user_id), to_epoch(datetime.fromisoformat(strike["timestamp"])))
+            for guild_id, users in data.items()
+            for user_id, strikes in users.items()
+            for strike in strikes
+        ]
+        self.db.executemany("INSERT INTO strikes (guild_id, user_id, timestamp) VALUES (?, ?, ?)", rows)
+        self.db.commit()
+        return len(rows)
+
+    def iter_strikes(self):
+        """Yields every stored strike as (guild_id, user_id, epoch seconds)."""
+        yield from self.db.execute("SELECT guild_id, user_id, timestamp FROM strikes")
+
+    def count_active(self, guild_id: int, user_id: int, now: Optional[datetime] = None) -> int:
+        """Returns how many strikes the member got within the last 30 days."""
+        cutoff = to_epoch(now) - int(STRIKE_EXPIRY.total_seconds())
+        row = self.db.execute(
+            "SELECT COUNT(*) FROM strikes WHERE guild_id = ? AND user_id = ? AND timestamp > ?",
+            (guild_id, user_id, cutoff)
+        ).fetchone()
+        return row[0]
+
+    def add_strike(self, guild_id: int, user_id: int, when: Optional[datetime] = None) -> int:
+        """Records a strike and returns the member's new active strike count."""
+        self.db.execute(
+            "INSERT INTO strikes (guild_id, user_id, timestamp) VALUES (?, ?, ?)",
+            (guild_id, user_id, to_epoch(when))
+        )
+        self.db.commit()
+        return self.count_active(guild_id, user_id, when)
+
+    def add_strikes(self, rows) -> int:
+        """Inserts (guild_id, user_id, epoch seconds) rows in one transaction."""
+        cursor = self.db.executemany("INSERT INTO strikes (guild_id, user_id, timestamp) VALUES (?, ?, ?)", rows)
+        self.db.commit()
+        return cursor.rowcount
+
+    def replace_strikes(self, rows) -> int:
+        """Replaces every stored strike with (guild_id, user_id, epoch seconds) rows, in one transaction."""
+        self.db.execute("DELETE FROM strikes")
+        cursor = self.db.executemany("INSERT INTO strikes (guild_id, user_id, timestamp) VALUES (?, ?, ?)", rows)
+        self.db.commit()
+        return cursor.rowcount
+
+    def clean_expired(self, now: Optional[datetime] = None, members=None) -> int:
+        """Deletes every strike older than 30 days, returns how many were removed.
+
+        `members` is ignored, the timestamp index already keeps this to the expired rows.
+        """
+        cutoff = to_epoch(now) - int(STRIKE_EXPIRY.total_seconds())
+        removed = self.db.execute("DELETE FROM strikes WHERE timestamp <= ?", (cutoff,)).rowcount
+        self.db.commit()
+        return removed
+
+    def compact(self, strikes=None) -> bool:
+        """Checkpoints the write-ahead log back into the database file; the strikes are already in it."""
+        self.db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return True
+
+    def close(self) -> None:
+        self.db.close()
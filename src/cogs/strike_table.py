@@ -0,0 +1,96 @@
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timezone
+
+class StrikeTable:
+    """In-memory strikes, packed as one sorted array('q') of epoch seconds per member.
+
+    Guilds and users are keyed by their integer snowflakes, so a strike costs
+    8 bytes plus its share of the per-member array instead of a dict holding an
+    ISO-8601 string. `from_json`/`to_json` convert to and from the strikes.json
+    layout ({guild_id: {user_id: [{"timestamp": iso}]}}).
+    """
+
+    def __init__(self) -> None:
+        self.guilds = {}
+        self.total = 0
+
+    def __len__(self) -> int:
+        return self.total
+
+    def get(self, guild_id: int, user_id: int):
+        return self.guilds.get(guild_id, {}).get(user_id)
+
+    def items(self):
+        """Yields (guild_id, user_id, timestamps) for every member with strikes."""
+        for guild_id, users in self.guilds.items():
+            for user_id, timestamps in users.items():
+                yield guild_id, user_id, timestamps
+
+    def add(self, guild_id: int, user_id: int, timestamp: int):
+        """Inserts a strike keeping the member's array sorted, returns that array."""
+        timestamps = self.guilds.setdefault(guild_id, {}).get(user_id)
+        if timestamps is None:
+            timestamps = self.guilds[guild_id][user_id] = array("q", (timestamp,))
+        elif timestamp >= timestamps[-1]:
+            timestamps.append(timestamp)
+        else:
+            timestamps.insert(bisect_right(timestamps, timestamp), timestamp)
+        self.total += 1
+        return timestamps
+
+    def count_after(self, guild_id: int, user_id: int, cutoff: int) -> int:
+        timestamps = self.get(guild_id, user_id)
+        if not timestamps:
+            return 0
+        return len(timestamps) - bisect_right(timestamps, cutoff)
+
+    def remove_until(self, guild_id: int, user_id: int, cutoff: int) -> int:
+        """Drops a member's strikes at or before cutoff, returns how many went."""
+        users = self.guilds.get(guild_id)
+        timestamps = users.get(user_id) if users else None
+        if not timestamps:
+            return 0
+
+        removed = bisect_right(timestamps, cutoff)
+        if removed == len(timestamps):
+            del users[user_id]
+            if not users:
+                del self.guilds[guild_id]
+        elif removed:
+            del timestamps[:removed]
+        self.total -= removed
+        return removed
+
+    def copy(self) -> "StrikeTable":
+        table = StrikeTable()
+        table.guilds = {guild_id: {user_id: timestamps[:] for user_id, timestamps in users.items()} for guild_id, users in self.guilds.items()}
+        table.total = self.total
+        return table
+
+    @classmethod
+    def from_json(cls, data: dict) -> "StrikeTable":
+        table = cls()
+        for guild_id, users in data.items():
+            packed = table.guilds.setdefault(int(guild_id), {})
+            for user_id, strikes in users.items():
+                if not strikes:
+                    continue
+                timestamps = sorted(int(datetime.fromisoformat(strike["timestamp"]).timestamp()) for strike in strikes)
+                packed[int(user_id)] = array("q", timestamps)
+                table.total += len(timestamps)
+            if not packed:
+                del table.guilds[int(guild_id)]
+        return table
+
+    def to_json(self) -> dict:
+        return {
+            str(guild_id): {
+                str(user_id): [
+                    {"timestamp": datetime.fromtimestamp(timestamp, timezone.utc).isoformat()}
+                    for timestamp in timestamps
+                ]
+                for user_id, timestamps in users.items()
+            }
+            for guild_id, users in self.guilds.items()
+        }
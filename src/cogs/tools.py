@@ -2,48 +2,57 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from cogs.ids import *
+from cogs.dispatch import log_or_warn
+from cogs.role_info import RoleInfo
+from cogs.art_index import ArtIndex
+from cogs import image_hash
+from cogs.image_intake import ImageRejected, MAX_UPLOAD_BYTES, intake
 from datetime import timedelta, datetime, timezone
-import json
-import os
+import asyncio
+import io
 
 class ToolsCog(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
+        self.role_info = RoleInfo()
+        self.art_index = ArtIndex()
+
+    async def check_image(self, file: discord.Attachment, with_hashes: bool = False) -> tuple:
+        """Downloads an upload once and runs it through image intake.
+
+        Returns (original bytes, IntakeResult or None, error for the user or
+        None). The download waits for a slot in the image pool, so a burst of
+        uploads doesn't keep every body in memory while it queues. Only without
+        Pillow is the result None with no error, and callers fall back to the
+        attachment's own URL; an upload the workers couldn't check is rejected.
+        """
+        async with self.bot.image_pool.reserve():
+            try:
+                data = await file.read()
+            except discord.HTTPException as e:
+                print(f"Couldn't download upload {file.filename}: {e}")
+                return None, None, "Couldn't download the attached image, please try again."
+            if not image_hash.available():
+                return data, None, None
+            try:
+                return data, await self.bot.image_pool.submit(intake, data, with_hashes), None
+            except ImageRejected as e:
+                return data, None, str(e)
+            except Exception as e:
+                # Includes a worker crashing on it (BrokenProcessPool), which is exactly what a malicious file would do
+                print(f"Couldn't check image from upload {file.filename}: {e!r}")
+                return data, None, "That image couldn't be processed, please try a different file."
+
+    def log_thumbnail(self, embed: discord.Embed, checked) -> list:
+        """Shows the upload's thumbnail on a log embed, returns the files to send with it."""
+        if not checked:
+            return None
+        filename = f"upload.{checked.thumbnail_extension}"
+        embed.set_image(url=f"attachment://{filename}")
+        return [discord.File(io.BytesIO(checked.thumbnail), filename=filename)]
 
     tools = app_commands.Group(name="tools", description="Jira's Tools and Utilities")
 
-    def load_strikes(self):
-        with open(os.path.abspath('./strikes.json'), "r") as f:
-            return json.load(f)
-
-    def save_strikes(self, data):
-        with open(os.path.abspath('./strikes.json'), "w") as f:
-            json.dump(data, f, indent=4)
-
-    def clean_expired_strikes(self, data):
-        now = datetime.now(timezone.utc)
-        updated = False
-        for guild_id in list(data.keys()):
-            for user_id in list(data[guild_id].keys()):
-                original_len = len(data[guild_id][user_id])
-
-                data[guild_id][user_id] = [
-                    strike for strike in data[guild_id][user_id]
-                    if datetime.fromisoformat(strike["timestamp"]) > now - timedelta(days=30)
-                ]
-
-                if not data[guild_id][user_id]:
-                    del data[guild_id][user_id]
-                    updated = True
-                elif len(data[guild_id][user_id]) != original_len:
-                    updated = True
-
-            if not data[guild_id]:
-                del data[guild_id]
-                updated = True
-
-        return updated
-
     @tools.command(name="report", description="Report a user or bug to staff.")
     async def report(self, interaction: discord.Interaction, reason: str, file: discord.Attachment = None, member: discord.Member = None):
         await interaction.response.send_message("Reporting member...", ephemeral=True)
@@ -59,19 +68,41 @@ class ToolsCog(commands.Cog):
             color=discord.Color.red()
         )
 
+        checked = None
         if file:
             if not file.content_type or not file.content_type.startswith("image/"):
                 await interaction.followup.send(f"{WARNING_EMOJI} Please upload a valid image file (PNG, JPEG, etc.)", ephemeral=True)
                 return
+            if file.size > MAX_UPLOAD_BYTES:
+                await interaction.followup.send(f"{WARNING_EMOJI} Images can be at most {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.", ephemeral=True)
+                return
+
+            # Decode and strip the image in the worker pool before staff see it
+            data, checked, error = await self.check_image(file)
+            if error:
+                await interaction.followup.send(f"{WARNING_EMOJI} {error}", ephemeral=True)
+                return
+            if checked:
+                embed.set_image(url=f"attachment://report.{checked.extension}")
             else:
                 embed.set_image(url=file.url)
+
+            # CDN links expire, keep our own copy of the original under this report's case number
+            try:
+                await asyncio.to_thread(self.bot.evidence.store, interaction.id, file.filename, file.content_type, data)
+                embed.set_footer(text=f"Case {interaction.id}")
+            except Exception as e:
+                await interaction.followup.send(f"{WARNING_EMOJI} Couldn't archive the attached image: {e}", ephemeral=True)
         
         embed.timestamp = discord.utils.utcnow()
 
         # Send to report channel
         report_channel = self.bot.get_channel(REPORTS_CHANNEL_ID)
         if report_channel:
-            await report_channel.send(embed=embed)
+            if checked:
+                await report_channel.send(embed=embed, file=discord.File(io.BytesIO(checked.data), filename=f"report.{checked.extension}"))
+            else:
+                await report_channel.send(embed=embed)
         else:
             await interaction.followup.send(f"{WARNING_EMOJI} Report channel with ID {REPORTS_CHANNEL_ID} not found.", ephemeral=True)
 
@@ -84,11 +115,7 @@ class ToolsCog(commands.Cog):
         embed.timestamp = discord.utils.utcnow()
 
         # Send to log channel
-        log_channel = self.bot.get_channel(LOG_CHANNEL_ID)
-        if log_channel:
-            await log_channel.send(embed=embed)
-        else:
-            await interaction.followup.send(f"{WARNING_EMOJI} Log channel with ID {LOG_CHANNEL_ID} not found.", ephemeral=True)
+        await log_or_warn(self.bot, embed, interaction, files=self.log_thumbnail(embed, checked))
 
         await interaction.followup.send(f"{CHECK_EMOJI} Your report has been sent to staff.", ephemeral=True)
 
@@ -106,13 +133,7 @@ class ToolsCog(commands.Cog):
         tenure = now - joined_at
         required_tenure = timedelta(days=3)
 
-        user_id = str(interaction.user.id)
-        data = self.load_strikes()
-        guild_id = str(interaction.guild.id)
-
-        self.clean_expired_strikes(data)
-
-        strikes = data.get(guild_id, {}).get(user_id, [])
+        strikes = self.bot.strikes.count_active(interaction.guild.id, interaction.user.id, now)
 
         if tenure >= required_tenure:
             role = interaction.guild.get_role(GOOBER_ROLE_ID)
@@ -124,7 +145,7 @@ class ToolsCog(commands.Cog):
                 await interaction.followup.send(f"{X_EMOJI} You already have Goober role.", ephemeral=True)
                 return
 
-            if int(len(strikes)) >= 2:
+            if strikes >= 2:
                 await interaction.followup.send(f"{X_EMOJI} You currently have 2+ active strikes and cannot obtain Goober role.", ephemeral=True)
                 return
 
@@ -141,11 +162,7 @@ class ToolsCog(commands.Cog):
                 embed.timestamp = discord.utils.utcnow()
 
                 # Send to log channel
-                log_channel = self.bot.get_channel(LOG_CHANNEL_ID)
-                if log_channel:
-                    await log_channel.send(embed=embed)
-                else:
-                    await interaction.followup.send(f"{WARNING_EMOJI} Log channel with ID {LOG_CHANNEL_ID} not found.", ephemeral=True)
+                await log_or_warn(self.bot, embed, interaction)
 
             except discord.Forbidden:
                 await interaction.followup.send(f"{WARNING_EMOJI} Failed to assign role to {interaction.user.mention}. Check my permissions. If you are seeing this, please report this to staff via `/tools report`.", ephemeral=True)
@@ -168,13 +185,7 @@ class ToolsCog(commands.Cog):
         tenure = now - joined_at
         required_tenure = timedelta(days=21)
 
-        user_id = str(interaction.user.id)
-        data = self.load_strikes()
-        guild_id = str(interaction.guild.id)
-
-        self.clean_expired_strikes(data)
-
-        strikes = data.get(guild_id, {}).get(user_id, [])
+        strikes = self.bot.strikes.count_active(interaction.guild.id, interaction.user.id, now)
 
         if tenure >= required_tenure:
             goober = interaction.guild.get_role(GOOBER_ROLE_ID)
@@ -191,7 +202,7 @@ class ToolsCog(commands.Cog):
                 await interaction.followup.send(f"{X_EMOJI} You must have Goober role before you can get Goober 2 role.", ephemeral=True)
                 return
 
-            if int(len(strikes)) >= 2:
+            if strikes >= 2:
                 await interaction.followup.send(f"{X_EMOJI} You currently have 2+ active strikes and cannot obtain Goober 2 role.", ephemeral=True)
                 return
 
@@ -208,11 +219,7 @@ class ToolsCog(commands.Cog):
                 embed.timestamp = discord.utils.utcnow()
 
                 # Send to log channel
-                log_channel = self.bot.get_channel(LOG_CHANNEL_ID)
-                if log_channel:
-                    await log_channel.send(embed=embed)
-                else:
-                    await interaction.followup.send(f"{WARNING_EMOJI} Log channel with ID {LOG_CHANNEL_ID} not found.", ephemeral=True)
+                await log_or_warn(self.bot, embed, interaction)
 
             except discord.Forbidden:
                 await interaction.followup.send(f"{WARNING_EMOJI} Failed to assign role to {interaction.user.mention}. Check my permissions. If you are seeing this, please report this to staff via `/tools report`.", ephemeral=True)
@@ -247,16 +254,47 @@ class ToolsCog(commands.Cog):
             await interaction.followup.send(f"{WARNING_EMOJI} Apply channel with ID {APPLY_CHANNEL_ID} not found.", ephemeral=True)
             return
 
+        if file.size > MAX_UPLOAD_BYTES:
+            await interaction.followup.send(f"{WARNING_EMOJI} Images can be at most {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.", ephemeral=True)
+            return
+
+        # Decode, strip and hash the image in the worker pool in one go
+        _, checked, error = await self.check_image(file, with_hashes=True)
+        if error:
+            await interaction.followup.send(f"{WARNING_EMOJI} {error}", ephemeral=True)
+            return
+
         # Create an embed with the image
         embed = discord.Embed(
             title=f"{ARTIST_ROLE_EMOJI} New Application",
             description=f"Uploaded by {interaction.user.mention}",
             color=discord.Color.blue()
         )
-        embed.set_image(url=file.url)
+        if checked:
+            embed.set_image(url=f"attachment://application.{checked.extension}")
+        else:
+            embed.set_image(url=file.url)
+
+        # Point reviewers at earlier submissions that look the same
+        hashes = checked.hashes if checked else None
+        if hashes:
+            matches = self.art_index.matches(*hashes)
+            if matches:
+                lines = [
+                    f"<@{user_id}> <t:{submitted}:R> · [application](https://discord.com/channels/{interaction.guild.id}/{APPLY_CHANNEL_ID}/{message_id}) · {100 - distance * 100 // 64}% similar"
+                    for distance, _, user_id, message_id, submitted in matches[:5]
+                ]
+                embed.add_field(name=f"{WARNING_EMOJI} Looks like earlier submissions", value="\n".join(lines), inline=False)
 
         # Send the embed to the target channel
-        await apply_channel.send(embed=embed)
+        if checked:
+            application = await apply_channel.send(embed=embed, file=discord.File(io.BytesIO(checked.data), filename=f"application.{checked.extension}"))
+        else:
+            application = await apply_channel.send(embed=embed)
+
+        if hashes:
+            self.art_index.add(*hashes, interaction.user.id, application.id)
+            await asyncio.to_thread(self.art_index.save)
 
         embed = discord.Embed(
             title=f"{ARTIST_ROLE_EMOJI} New Artist Application",
@@ -267,11 +305,7 @@ class ToolsCog(commands.Cog):
         embed.timestamp = discord.utils.utcnow()
 
         # Send to log channel
-        log_channel = self.bot.get_channel(LOG_CHANNEL_ID)
-        if log_channel:
-            await log_channel.send(embed=embed)
-        else:
-            await interaction.followup.send(f"{WARNING_EMOJI} Log channel with ID {LOG_CHANNEL_ID} not found.", ephemeral=True)
+        await log_or_warn(self.bot, embed, interaction, files=self.log_thumbnail(embed, checked))
 
         # Confirm to user
         await interaction.followup.send(f"{CHECK_EMOJI} Your application for Artist role has been sent.", ephemeral=True)
@@ -319,11 +353,7 @@ class ToolsCog(commands.Cog):
         embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
         embed.timestamp = discord.utils.utcnow()
 
-        log_channel = self.bot.get_channel(LOG_CHANNEL_ID)
-        if log_channel:
-            await log_channel.send(embed=embed)
-        else:
-            await interaction.followup.send(f"{WARNING_EMOJI} Log channel with ID {LOG_CHANNEL_ID} not found.", ephemeral=True)
+        await log_or_warn(self.bot, embed, interaction)
 
         # Try to DM the user
         try:
@@ -357,18 +387,11 @@ class ToolsCog(commands.Cog):
             if MOD_ROLE_ID not in author_roles:
                 await interaction.followup.send(f"{X_EMOJI} You don't have permission to check the strikes of other users.", ephemeral=True)
                 return
-            user_id = str(member.id)
         else:
-            user_id = str(interaction.user.id)
             member = interaction.user
-        
-        data = self.load_strikes()
-        guild_id = str(interaction.guild.id)
 
-        self.clean_expired_strikes(data)
-
-        strikes = data.get(guild_id, {}).get(user_id, [])
-        await interaction.followup.send(f"{member.mention} has {len(strikes)} active strike(s).", ephemeral=True)
+        strikes = self.bot.strikes.count_active(interaction.guild.id, member.id)
+        await interaction.followup.send(f"{member.mention} has {strikes} active strike(s).", ephemeral=True)
     
     @tools.command(name="roles", description="For creating/updating the embed in #role-info.")
     async def roles(self, interaction: discord.Interaction, edit : bool = True):
@@ -380,78 +403,28 @@ class ToolsCog(commands.Cog):
             await interaction.followup.send(f"{X_EMOJI} You don't have permission to use this command.", ephemeral=True)
             return
 
-        embeds = []
-
-        file = discord.File(os.path.abspath('./img/Roles.png'), filename="Roles.png")
-
-        embed_exclusive = discord.Embed(color=16772213)
-        embed_exclusive.add_field(inline=False, name=f"{STAR_EMOJI} Exclusive Roles {STAR_EMOJI}", value="----------------------------\n")
-        embed_exclusive.add_field(inline=True, name="", value=f"{ACRYLIC_ROLE_EMOJI}{ACRYLIC_ROLE_MENTION}{ACRYLIC_ROLE_EMOJI}\nA role exclusive to the channel owner himself, Acrylic")
-        embed_exclusive.add_field(inline=True, name="", value=f"{SALAMI_ROLE_EMOJI}{SALAMI_ROLE_MENTION}{SALAMI_ROLE_EMOJI}\nA role exclusive to Salami, the artist for the videos")
-        embed_exclusive.add_field(inline=True, name="", value=f"{CREATORS_ROLE_EMOJI}{CREATORS_ROLE_MENTION}{CREATORS_ROLE_EMOJI}\nA role exclusive to the creators of the channel, its real purpose is just to group Acrylic and Salami together on the member list")
-        embeds.append(embed_exclusive)
-
-        embed_staff = discord.Embed(color=16772213)
-        embed_staff.add_field(inline=False, name=f"{STAFF_EMOJI} Staff Roles {STAFF_EMOJI}", value="----------------------------\n")
-        embed_staff.add_field(inline=True, name="", value=f"{ART_PANEL_ROLE_EMOJI}{ART_PANEL_ROLE_MENTION}{ART_PANEL_ROLE_EMOJI}\nBehind the scenes access to upcoming videos, providing feedback and suggested changes to make before the video is released publicly")
-        embed_staff.add_field(inline=True, name="", value=f"{MOD_ROLE_EMOJI}{MOD_ROLE_MENTION}{MOD_ROLE_EMOJI}\nAccess to <@1396161419434655855> commands. Moderates server to ensure a safe environment for everybody")
-        embeds.append(embed_staff)
-
-        embed_community = discord.Embed(color=16772213)
-        embed_community.add_field(inline=False, name=f"{COMMUNITY_EMOJI} Community Roles {COMMUNITY_EMOJI}", value="----------------------------\n")
-        embed_community.add_field(inline=True, name="", value=f"{SPECIAL_ROLE_EMOJI}{SPECIAL_ROLE_MENTION}{SPECIAL_ROLE_EMOJI}\nGranted to users under special circumstances, say winning an event")
-        embed_community.add_field(inline=True, name="", value=f"{SUPER_SUPPORTER_ROLE_EMOJI}{SUPER_SUPPORTER_ROLE_MENTION}{SUPER_SUPPORTER_ROLE_EMOJI}\nAutomatically granted to those who are a Tier 2, YouTube channel member and a Tier 3, Twitch sub. No additional perks, you just stand out more")
-        embed_community.add_field(inline=True, name="", value=f"{MEMBER_TIER_2_ROLE_EMOJI}{MEMBER_TIER_2_ROLE_MENTION}{MEMBER_TIER_2_ROLE_EMOJI}\nAutomatically granted to those who are a Tier 2, YouTube channel member. See YouTube channel for perks")
-        embed_community.add_field(inline=True, name="", value=f"{MEMBER_TIER_1_ROLE_EMOJI}{MEMBER_TIER_1_ROLE_MENTION}{MEMBER_TIER_1_ROLE_EMOJI}\nAutomatically granted to those who are a Tier 1, YouTube channel member. See YouTube channel for perks")
-        embed_community.add_field(inline=True, name="", value=f"{MEMBER_ROLE_EMOJI}{MEMBER_ROLE_MENTION}{MEMBER_ROLE_EMOJI}\nAutomatically granted to anyone who is a YouTube channel member, regardless of tier. Comes with perms to change your nickname")
-        embed_community.add_field(inline=True, name="", value=f"{SUB_TIER_3_ROLE_EMOJI}{SUB_TIER_3_ROLE_MENTION}{SUB_TIER_3_ROLE_EMOJI}\nAutomatically granted to those who are a Tier 3, Twitch sub")
-        embed_community.add_field(inline=True, name="", value=f"{SUB_TIER_2_ROLE_EMOJI}{SUB_TIER_2_ROLE_MENTION}{SUB_TIER_2_ROLE_EMOJI}\nAutomatically granted to those who are a Tier 2, Twitch sub")
-        embed_community.add_field(inline=True, name="", value=f"{SUB_TIER_1_ROLE_EMOJI}{SUB_TIER_1_ROLE_MENTION}{SUB_TIER_1_ROLE_EMOJI}\nAutomatically granted to those who are a Tier 1, Twitch sub")
-        embed_community.add_field(inline=True, name="", value=f"{SUB_ROLE_EMOJI}{SUB_ROLE_MENTION}{SUB_ROLE_EMOJI}\nAutomatically granted to anyone who is a Twitch sub, regardless of tier. Comes with perms to change your nickname")
-        embed_community.add_field(inline=True, name="", value=f"{BOOSTER_ROLE_EMOJI}{BOOSTER_ROLE_MENTION}{BOOSTER_ROLE_EMOJI}\nAutomatically granted to those who boost the server. Comes with perms to change your nickname")
-        embed_community.add_field(inline=True, name="", value=f"{ARTIST_ROLE_EMOJI}{ARTIST_ROLE_MENTION}{ARTIST_ROLE_EMOJI}\nApply for this role using `/tools artist` and send your own art. Don't worry, your art isn't being judged on skill, the application process is just to prevent low effort, stolen, and or A.I. art")
-        embed_community.add_field(inline=True, name="", value=f"{GOOBER_2_ROLE_EMOJI}{GOOBER_2_ROLE_MENTION}{GOOBER_2_ROLE_EMOJI}\nRun `/tools goober2` at least 3 weeks after joining and you will be granted this role. Comes with perms to create polls, change your nickname, and start activities in voice chats")
-        embed_community.add_field(inline=True, name="", value=f"{GOOBER_ROLE_EMOJI}{GOOBER_ROLE_MENTION}{GOOBER_ROLE_EMOJI}\nRun `/tools goober` at least 3 days after joining and you will be granted this role. Comes with extended reaction perms, along with image and embed perms")
-        embeds.append(embed_community)
-
-        embed_notification = discord.Embed(color=16772213)
-        embed_notification.add_field(inline=False, name=f"{PUSHPIN_EMOJI} Notification Roles {PUSHPIN_EMOJI}", value="----------------------------\n")
-        embed_notification.add_field(inline=True, name="", value=f"{POLL_PINGS_ROLE_MENTION}\nSometimes we host polls for everybody to participate in, not just channel members")
-        embed_notification.add_field(inline=True, name="", value=f"{EVENT_PINGS_ROLE_MENTION}\nYou'll be pinged for events. What kind of events? idk maybe like a game sesh or something")
-        embed_notification.add_field(inline=True, name="", value=f"{MERCH_PINGS_ROLE_MENTION}\nYou'll be pinged whenever new merch is announced and or dropped")
-        embed_notification.add_field(inline=True, name="", value=f"{GIVEAWAY_PINGS_ROLE_MENTION}\nYou'll be pinged whenever a giveaway is hosted")
-        embed_notification.add_field(inline=True, name="", value=f"{STREAM_PINGS_ROLE_MENTION}\nGet notified when Acrylic goes live")
-        embed_notification.add_field(inline=True, name="", value=f"{SECOND_CHANNEL_PINGS_ROLE_MENTION}\nGet notified whenever a video is posted on the second channel")
-        embed_notification.add_field(inline=True, name="", value=f"{VOD_CHANNEL_PINGS_ROLE_MENTION}\nYou'll be notified whenever a video is uploaded to the VOD channel")
-        embed_notification.add_field(inline=False, name="", value="")
-        embed_notification.add_field(inline=False, name="To obtain these roles, go to the \"Channels & Roles\" tab", value="")
-        embeds.append(embed_notification)
+        role_info = self.role_info
 
         if edit:
-            target_message = None
-            for channel in interaction.guild.text_channels:
-                try:
-                    msg = await channel.fetch_message(ROLE_INFO_EMBED_MESSAGE_ID)
-                    if msg:
-                        target_message = msg
-                        break
-                except (discord.NotFound, discord.Forbidden, discord.HTTPException):
-                    continue
+            if role_info.is_current(ROLE_INFO_EMBED_MESSAGE_ID):
+                await interaction.followup.send(f"{CHECK_EMOJI} Role embeds are already up to date.", ephemeral=True)
+                return
+
+            target_message = await self.bot.message_index.find(interaction.guild, ROLE_INFO_EMBED_MESSAGE_ID)
 
             if not target_message:
                 await interaction.followup.send(f"{WARNING_EMOJI} Message not found in any accessible text channel.", ephemeral=True)
                 return
-                
-            await msg.edit(embeds=embeds)
+
+            # Leaving attachments out of the edit keeps the image already on the message
+            await target_message.edit(embeds=role_info.embeds)
+            role_info.mark_published(target_message.id)
             await interaction.followup.send(f"{CHECK_EMOJI} Role embeds have been updated.", ephemeral=True)
         else:
             role_channel = self.bot.get_channel(ROLE_INFO_CHANNEL_ID)
             if role_channel:
-                await role_channel.send(embeds=embeds, file=file)
-                #await role_channel.send(embed=embed_exclusive, file=file)
-                #await role_channel.send(embed=embed_staff)
-                #await role_channel.send(embed=embed_community)
-                #await role_channel.send(embed=embed_notification)
+                message = await role_channel.send(embeds=role_info.embeds, file=role_info.image_file())
+                role_info.mark_published(message.id)
                 await interaction.followup.send(f"{CHECK_EMOJI} Role embeds have been created.", ephemeral=True)
             else:
                 await interaction.followup.send(f"{WARNING_EMOJI} Role channel with ID {ROLE_INFO_CHANNEL_ID} not found.", ephemeral=True)
\ No newline at end of file
@@ -0,0 +1,46 @@
+# Compiles the link blocklist and checks text against it, without starting the bot.
+#
+# Run from the repo root (same place as main.py so it finds the same files):
+#   python src/links_cli.py compile                      # link_blocklist.txt -> link_blocklist.bin
+#   python src/links_cli.py compile phishing-hosts.txt -o link_blocklist.bin
+#   python src/links_cli.py check "free nitro at https://gift.example.com/claim"
+#
+# The bot recompiles by itself when link_blocklist.txt changes; compiling here is for big
+# lists, so the bot only ever has to load the compiled file.
+
+import argparse
+import sys
+import time
+
+from cogs.link_filter import LinkFilter, compile_blocklist
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile or test the link blocklist")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sub = subparsers.add_parser("compile")
+    sub.add_argument("file", nargs="?", default="link_blocklist.txt", help="text list, one domain per line")
+    sub.add_argument("-o", "--output", default="link_blocklist.bin")
+
+    sub = subparsers.add_parser("check")
+    sub.add_argument("text", nargs="+", help="message text or hosts to check")
+    sub.add_argument("--compiled", default="link_blocklist.bin")
+
+    args = parser.parse_args()
+
+    if args.command == "compile":
+        start = time.perf_counter()
+        count = compile_blocklist(args.file, args.output)
+        print(f"Compiled {count} domain(s) into {args.output} in {time.perf_counter() - start:.1f}s.", file=sys.stderr)
+    else:
+        # No text list, so only the compiled file is loaded
+        link_filter = LinkFilter(path=None, compiled_path=args.compiled)
+        blocked = False
+        for text in args.text:
+            matched = link_filter.check(text)
+            blocked = blocked or matched is not None
+            print(f"{'BLOCKED' if matched else 'ok':8} {text}" + (f" (under {matched})" if matched else ""))
+        sys.exit(1 if blocked else 0)
+
+if __name__ == "__main__":
+    main()
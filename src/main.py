@@ -1,14 +1,17 @@
-# Yes i have the same functions in three different files, i have no clue how cogs work xyno lol
-
 import discord
 from discord.ext import commands, tasks
+import asyncio
 import os
 from dotenv import load_dotenv
-from datetime import timedelta, datetime, timezone
-from typing import Optional
-import json
 
-from cogs import moderation, tools, secret
+from cogs import moderation, tools, secret, automod
+from cogs.strike_service import StrikeService, open_strike_store
+from cogs.message_index import MessageIndex
+from cogs.evidence_archive import EvidenceArchive
+from cogs.ban_index import BanIndex
+from cogs.log_writer import LogWriter
+from cogs.raid_detector import RaidDetector
+from cogs.image_pool import ImagePool
 from cogs.ids import *
 
 load_dotenv()
@@ -17,38 +20,6 @@ intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 
-def load_strikes():
-        with open(os.path.abspath('strikes.json'), "r") as f:
-            return json.load(f)
-
-def save_strikes(data):
-    with open(os.path.abspath('strikes.json'), "w") as f:
-        json.dump(data, f, indent=4)
-
-def clean_expired_strikes(data):
-    now = datetime.now(timezone.utc)
-    updated = False
-    for guild_id in list(data.keys()):
-        for user_id in list(data[guild_id].keys()):
-            original_len = len(data[guild_id][user_id])
-
-            data[guild_id][user_id] = [
-                strike for strike in data[guild_id][user_id]
-                if datetime.fromisoformat(strike["timestamp"]) > now - timedelta(days=30)
-            ]
-
-            if not data[guild_id][user_id]:
-                del data[guild_id][user_id]
-                updated = True
-            elif len(data[guild_id][user_id]) != original_len:
-                updated = True
-
-        if not data[guild_id]:
-            del data[guild_id]
-            updated = True
-
-        return updated
-
 class Bot(commands.Bot):
     def __init__(self):
         intents = discord.Intents.default()
@@ -56,45 +27,72 @@ class Bot(commands.Bot):
         intents.members = True
         super().__init__(command_prefix="!", intents=intents)
 
+        # strike_backend=journal keeps strikes in an append-only journal + snapshot instead of SQLite.
+        # Changing it carries every strike over from the backend that ran last (see strikes.backend)
+        self.strikes = StrikeService(open_strike_store())
+        self.message_index = MessageIndex()
+        self.evidence = EvidenceArchive()
+        self.bans = BanIndex()
+        self.raids = RaidDetector()
+        self.image_pool = ImagePool()
+        self.log_writer = LogWriter(self)
+
     async def setup_hook(self):
+        await self.strikes.start()
+        self.log_writer.start()
         await self.add_cog(moderation.ModerationCog(self))
         await self.add_cog(tools.ToolsCog(self))
         await self.add_cog(secret.SecretCog(self))
-
-bot = Bot()
-
-@tasks.loop(hours=6)
-async def auto_clean_strikes():
-    data = load_strikes()
-    if clean_expired_strikes(data):
-        save_strikes(data)
-
-@bot.event
-async def on_ready():
-    auto_clean_strikes.start()
-    print(f'Logged in as {bot.user}')
-    await bot.tree.sync()
-    print("Commands synced!")
-
-@bot.event
-async def on_message(message):
-    mention = f'<@{bot.user.id}>'
-    if mention in message.content:
-        await message.reply("hi my name jira")
-
-@bot.event
-async def on_member_update(before, after):
-    if before.roles != after.roles:
-        roles = [role.id for role in after.roles]
-        role = bot.get_guild(1381383838399332454).get_role(SUPER_SUPPORTER_ROLE_ID)
-
-        # If they have the two roles needed, but dont have the new role
-        if MEMBER_TIER_2_ROLE_ID in roles and SUB_TIER_3_ROLE_ID in roles and SUPER_SUPPORTER_ROLE_ID not in roles:
-            await after.add_roles(role)
-        # Removing the role if they no longer have the prereqs
-        elif SUPER_SUPPORTER_ROLE_ID in roles and MEMBER_TIER_2_ROLE_ID not in roles or SUB_TIER_3_ROLE_ID not in roles:
-            await after.remove_roles(role)
-
-
-token = os.getenv("bot_token")
-bot.run(token)
+        await self.add_cog(automod.AutoModCog(self))
+        # Started here rather than in on_ready, which runs again on every reconnect
+        self.compact_strikes.start()
+        self.save_message_index.start()
+
+    async def close(self):
+        await self.log_writer.close()
+        await self.strikes.close()
+        await asyncio.to_thread(self.message_index.save)
+        self.evidence.close()
+        self.image_pool.close()
+        await super().close()
+
+    @tasks.loop(minutes=15)
+    async def compact_strikes(self):
+        await self.strikes.compact()
+        stats = self.strikes.cache_stats()
+        print(f"Strike count cache: {stats['entries']} members, {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+
+    @tasks.loop(minutes=10)
+    async def save_message_index(self):
+        await asyncio.to_thread(self.message_index.save)
+
+    async def on_ready(self):
+        print(f'Logged in as {self.user}')
+        await self.tree.sync()
+        print("Commands synced!")
+
+    async def on_message(self, message):
+        if message.guild:
+            self.message_index.record(message.id, message.channel.id)
+
+        mention = f'<@{self.user.id}>'
+        if mention in message.content:
+            await message.reply("hi my name jira")
+
+    async def on_member_update(self, before, after):
+        if before.roles != after.roles:
+            roles = [role.id for role in after.roles]
+            role = self.get_guild(1381383838399332454).get_role(SUPER_SUPPORTER_ROLE_ID)
+
+            # If they have the two roles needed, but dont have the new role
+            if MEMBER_TIER_2_ROLE_ID in roles and SUB_TIER_3_ROLE_ID in roles and SUPER_SUPPORTER_ROLE_ID not in roles:
+                await after.add_roles(role)
+            # Removing the role if they no longer have the prereqs
+            elif SUPER_SUPPORTER_ROLE_ID in roles and MEMBER_TIER_2_ROLE_ID not in roles or SUB_TIER_3_ROLE_ID not in roles:
+                await after.remove_roles(role)
+
+# The image pool's worker processes import this file too, they mustn't start a bot of their own
+if __name__ == "__main__":
+    bot = Bot()
+    token = os.getenv("bot_token")
+    bot.run(token)
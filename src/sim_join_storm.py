@@ -0,0 +1,95 @@
+# Replays synthetic join storms through RaidDetector and the batched lockdown timeouts
+# Run from src/: python sim_join_storm.py --storm-size 300 --storm-rate 20
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from cogs.batch_timeout import timeout_members
+from cogs.raid_detector import RaidDetector, join_weight
+
+GUILD_ID = 1
+
+class FakeMember:
+    """Just enough of discord.Member for timeout_members, with API latency."""
+
+    def __init__(self, member_id: int, latency: float) -> None:
+        self.id = member_id
+        self.latency = latency
+
+    async def timeout(self, until, reason=None):
+        await asyncio.sleep(self.latency)
+
+def synthetic_joins(args, rng) -> list:
+    """(seconds, member_id, account_created, has_avatar, raider) for a quiet baseline with a storm in it."""
+    now = datetime.now(timezone.utc)
+    joins = []
+    t = 0.0
+    while t < args.baseline:
+        t += rng.expovariate(args.baseline_rate / 60)
+        created = now - timedelta(days=rng.uniform(1, 2000))
+        joins.append((t, len(joins), created, rng.random() < 0.7, False))
+
+    start = args.baseline / 2
+    for i in range(args.storm_size):
+        t = start + i / args.storm_rate + rng.uniform(0, 0.5 / args.storm_rate)
+        created = now - timedelta(hours=rng.uniform(0, args.storm_account_age_hours))
+        joins.append((t, 10_000_000 + i, created, rng.random() < args.storm_avatar_rate, True))
+    return sorted(joins)
+
+async def run_timeouts(member_ids: list, latency: float, chunk_size: int) -> float:
+    members = [FakeMember(member_id, latency) for member_id in member_ids]
+    start = time.perf_counter()
+    await timeout_members(members, timedelta(hours=1), "sim", chunk_size=chunk_size)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Join storm simulation")
+    parser.add_argument("--baseline", type=float, default=3600, help="Simulated seconds of normal joins")
+    parser.add_argument("--baseline-rate", type=float, default=2, help="Normal joins per minute")
+    parser.add_argument("--storm-size", type=int, default=300)
+    parser.add_argument("--storm-rate", type=float, default=20, help="Raid joins per second")
+    parser.add_argument("--storm-account-age-hours", type=float, default=48)
+    parser.add_argument("--storm-avatar-rate", type=float, default=0.1)
+    parser.add_argument("--latency", type=float, default=0.15, help="Simulated seconds per timeout request")
+    parser.add_argument("--chunk-size", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    joins = synthetic_joins(args, rng)
+    reference = datetime.now(timezone.utc)
+
+    detector = RaidDetector()
+    lockdown_at = None
+    false_trips = 0
+    for t, member_id, created, has_avatar, raider in joins:
+        if detector.record_join(GUILD_ID, member_id, join_weight(created, has_avatar, reference), t):
+            if raider:
+                lockdown_at = lockdown_at or t
+            else:
+                false_trips += 1
+    pending = detector.take_pending(GUILD_ID)
+
+    raiders = {member_id for _, member_id, _, _, raider in joins if raider}
+    caught = raiders.intersection(pending)
+    bystanders = len(set(pending) - raiders)
+    storm_start = args.baseline / 2
+
+    print(f"joins:              {len(joins):,} ({len(raiders)} raiders at {args.storm_rate:g}/s)")
+    if lockdown_at is None:
+        print("lockdown:           never started")
+    else:
+        print(f"lockdown:           {lockdown_at - storm_start:.2f}s after the storm began")
+    print(f"false lockdowns:    {false_trips}")
+    print(f"raiders queued:     {len(caught)}/{len(raiders)}")
+    print(f"bystanders queued:  {bystanders} (normal joins that landed in the lockdown)")
+
+    chunked = asyncio.run(run_timeouts(pending, args.latency, args.chunk_size))
+    sequential = len(pending) * args.latency
+    print(f"timeouts:           {chunked:.1f}s in chunks of {args.chunk_size}, vs ~{sequential:.1f}s one at a time")
+
+if __name__ == "__main__":
+    main()
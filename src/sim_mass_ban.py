@@ -0,0 +1,144 @@
+# Runs mass_ban against a fake guild and checks chunking, skipped members and failed chunks
+# Run from src/: python sim_mass_ban.py --raiders 450 --latency 0.05
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import namedtuple
+from functools import total_ordering
+
+import discord
+
+from cogs.ids import PROTECTED_ROLE_IDS
+from cogs.mass_ban import mass_ban
+
+BulkBanResult = namedtuple("BulkBanResult", "banned failed")
+
+@total_ordering
+class FakeRole:
+    def __init__(self, role_id: int, position: int) -> None:
+        self.id = role_id
+        self.position = position
+
+    def __eq__(self, other):
+        return self.position == other.position
+
+    def __lt__(self, other):
+        return self.position < other.position
+
+class FakeMember:
+    """Just enough of discord.Member for mass_ban: an ID and roles, lowest first like discord.py."""
+
+    def __init__(self, member_id: int, *roles: FakeRole) -> None:
+        self.id = member_id
+        self.roles = [EVERYONE, *roles]
+        self.top_role = max(self.roles)
+
+class FakeResponse:
+    status = 500
+    reason = "Internal Server Error"
+
+class FakeGuild:
+    """Records every bulk_ban call. IDs in `gone` come back as failed, chunks holding an ID in `broken` raise."""
+
+    def __init__(self, members: list, me: FakeMember, owner_id: int, latency: float, gone=(), broken=()) -> None:
+        self.members = {member.id: member for member in members}
+        self.me = me
+        self.owner_id = owner_id
+        self.latency = latency
+        self.gone = set(gone)
+        self.broken = set(broken)
+        self.calls = []
+        self.banned = set()
+
+    def get_member(self, user_id: int):
+        return self.members.get(user_id)
+
+    async def bulk_ban(self, users, reason=None, delete_message_seconds=86400):
+        ids = [user.id for user in users]
+        self.calls.append(ids)
+        await asyncio.sleep(self.latency)
+        if self.broken.intersection(ids):
+            raise discord.HTTPException(FakeResponse(), "simulated server error")
+        banned = [user for user in users if user.id not in self.gone]
+        self.banned.update(user.id for user in banned)
+        return BulkBanResult(banned, [user for user in users if user.id in self.gone])
+
+EVERYONE = FakeRole(0, 0)
+MEMBER_ROLE = FakeRole(1, 1)
+MOD_ROLE = FakeRole(2, 5)
+BOT_ROLE = FakeRole(3, 10)
+ADMIN_ROLE = FakeRole(4, 20)
+PROTECTED_ROLE = FakeRole(PROTECTED_ROLE_IDS[0], 2)
+
+failures = 0
+
+def check(name: str, condition: bool) -> None:
+    global failures
+    print(f"{'ok  ' if condition else 'FAIL'} {name}")
+    failures += not condition
+
+def main():
+    parser = argparse.ArgumentParser(description="Mass ban against a fake guild")
+    parser.add_argument("--raiders", type=int, default=450)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated seconds per bulk ban request")
+    args = parser.parse_args()
+
+    owner = FakeMember(1)
+    bot = FakeMember(2, BOT_ROLE)
+    moderator = FakeMember(3, MOD_ROLE)
+    raiders = [FakeMember(10_000 + i) for i in range(args.raiders)]
+    protected = FakeMember(20, PROTECTED_ROLE)
+    admin = FakeMember(21, ADMIN_ROLE)          # Above the bot
+    fellow_mod = FakeMember(22, MOD_ROLE)       # Level with the moderator, below the bot
+    helper = FakeMember(23, MEMBER_ROLE)        # Below both, a normal target
+    not_in_guild = [900_000 + i for i in range(5)]
+    skipped = [owner.id, moderator.id, protected.id, admin.id, fellow_mod.id]
+
+    user_ids = [member.id for member in raiders] + skipped + [helper.id] + not_in_guild
+    members = [owner, bot, moderator, protected, admin, fellow_mod, helper, *raiders]
+    targets = len(user_ids) - len(skipped)
+
+    # Clean run
+    guild = FakeGuild(members, bot, owner.id, args.latency)
+    progress = []
+
+    async def record_progress(result, total):
+        progress.append((len(result.banned) + len(result.failed), total))
+
+    start = time.perf_counter()
+    result = asyncio.run(mass_ban(guild, user_ids, "sim", progress=record_progress, exclude={moderator.id}, moderator=moderator, chunk_size=args.chunk_size))
+    elapsed = time.perf_counter() - start
+
+    sizes = [len(call) for call in guild.calls]
+    expected_sizes = [min(args.chunk_size, targets - start) for start in range(0, targets, args.chunk_size)]
+    print(f"targets:            {targets} in {len(sizes)} request(s) of {sizes}, {elapsed:.2f}s")
+    check("chunks are at most chunk_size and in order", sizes == expected_sizes)
+    check("every target banned once", len(result.banned) == targets and sorted(sum(guild.calls, [])) == sorted(set(result.banned)))
+    check("IDs not in the guild are still banned", set(not_in_guild) <= guild.banned)
+    check("protected role and excluded moderator skipped", sorted(result.protected) == sorted([moderator.id, protected.id]))
+    check("owner, above-bot and level-with-moderator skipped by hierarchy", sorted(result.outranked) == sorted([owner.id, admin.id, fellow_mod.id]))
+    check("no skipped member reached bulk_ban", not guild.banned.intersection(skipped))
+    check("progress reported after every chunk", [done for done, _ in progress] == [sum(expected_sizes[:i + 1]) for i in range(len(expected_sizes))])
+    check("total accounts for every ID", result.total == len(user_ids))
+
+    # Partial failures: a few IDs come back failed inside a good chunk, and one whole chunk errors
+    gone = [raiders[5].id, raiders[6].id]
+    broken_chunk = 1 if len(expected_sizes) > 2 else len(expected_sizes) - 1
+    broken = raiders[broken_chunk * args.chunk_size].id
+    guild = FakeGuild(members, bot, owner.id, args.latency, gone=gone, broken=[broken])
+    result = asyncio.run(mass_ban(guild, user_ids, "sim", exclude={moderator.id}, moderator=moderator, chunk_size=args.chunk_size))
+
+    failed_chunk = set(guild.calls[broken_chunk])
+    print(f"partial failure:    {len(result.banned)} banned, {len(result.failed)} failed")
+    check("failed IDs in a good chunk are reported, the rest of it is banned", set(gone) <= set(result.failed) and not guild.banned.intersection(gone))
+    check("an erroring chunk fails as a whole", failed_chunk <= set(result.failed) and not guild.banned.intersection(failed_chunk))
+    check("chunks after the erroring one still run", len(guild.calls) == len(expected_sizes))
+    check("banned + failed covers every target", len(result.banned) + len(result.failed) == targets)
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
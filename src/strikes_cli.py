@@ -0,0 +1,115 @@
+# Streams the strike store to and from newline-delimited JSON, one strike per line:
+#   {"guild_id": 123, "user_id": 456, "timestamp": "2025-09-01T12:00:00+00:00"}
+#
+# Run from the repo root (same place as main.py so it finds the same files):
+#   python src/strikes_cli.py export --guild 1381383838399332454 --since 2025-09-01 > strikes.ndjson
+#   python src/strikes_cli.py import strikes.ndjson --batch-size 5000
+#
+# Export holds one strike at a time (one member's for the journal backend); import holds one
+# batch. Stop the bot first: it only reads the store at startup, and a journal compaction
+# during an export can skip strikes.
+#
+# Both commands use the backend the bot would. If strike_backend was switched since the bot
+# last ran, the strikes are carried over to the new backend first, the same as at bot startup.
+
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+from itertools import islice
+
+from dotenv import load_dotenv
+
+from cogs.strike_service import open_strike_store, stream_strikes
+
+def parse_time(value: str) -> int:
+    """Takes an ISO-8601 date/time (UTC if no offset given) or epoch seconds."""
+    try:
+        return int(value)
+    except ValueError:
+        when = datetime.fromisoformat(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return int(when.timestamp())
+
+def keep(rows, guilds=None, since=None, until=None):
+    """Filters (guild_id, user_id, epoch seconds) rows while they stream past."""
+    for row in rows:
+        guild_id, _, timestamp = row
+        if guilds and guild_id not in guilds:
+            continue
+        if since is not None and timestamp < since:
+            continue
+        if until is not None and timestamp >= until:
+            continue
+        yield row
+
+def read_ndjson(lines):
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            yield int(record["guild_id"]), int(record["user_id"]), parse_time(str(record["timestamp"]))
+        except (ValueError, KeyError) as e:
+            print(f"Skipping line {number}: {e}", file=sys.stderr)
+
+def batches(rows, size: int):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+def export_strikes(rows, out, **filters) -> int:
+    count = 0
+    for guild_id, user_id, timestamp in keep(rows, **filters):
+        out.write(json.dumps({
+            "guild_id": guild_id,
+            "user_id": user_id,
+            "timestamp": datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+        }) + "\n")
+        count += 1
+    return count
+
+def import_strikes(store, lines, batch_size: int, **filters) -> int:
+    count = 0
+    for batch in batches(keep(read_ndjson(lines), **filters), batch_size):
+        count += store.add_strikes(batch)
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import strikes as NDJSON")
+    parser.add_argument("--backend", choices=["sqlite", "journal"], help="defaults to the strike_backend env var, like the bot; switching carries strikes over from the last backend")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("export", "import"):
+        sub = subparsers.add_parser(name)
+        sub.add_argument("file", nargs="?", default="-", help="NDJSON file, - for stdout/stdin")
+        sub.add_argument("--guild", type=int, action="append", help="only this guild, can be repeated")
+        sub.add_argument("--since", type=parse_time, help="only strikes at or after this time")
+        sub.add_argument("--until", type=parse_time, help="only strikes before this time")
+        if name == "import":
+            sub.add_argument("--batch-size", type=int, default=1000)
+
+    args = parser.parse_args()
+    load_dotenv()
+
+    filters = {"guilds": set(args.guild) if args.guild else None, "since": args.since, "until": args.until}
+    if args.command == "export":
+        out = sys.stdout if args.file == "-" else open(args.file, "w", encoding="utf-8")
+        with out:
+            count = export_strikes(stream_strikes(args.backend), out, **filters)
+        print(f"Exported {count} strike(s).", file=sys.stderr)
+        return
+
+    store = open_strike_store(args.backend)
+    try:
+        lines = sys.stdin if args.file == "-" else open(args.file, "r", encoding="utf-8")
+        with lines:
+            count = import_strikes(store, lines, args.batch_size, **filters)
+        print(f"Imported {count} strike(s).", file=sys.stderr)
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()